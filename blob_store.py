@@ -0,0 +1,247 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+from google.genai import types
+
+from config import BLOB_INLINE_BYTES, BLOB_MEMORY_BYTES
+
+# Key marking a function response value that was moved into the blob store
+BLOB_REF_KEY = "$blob"
+
+
+class BlobStore:
+    """
+    Content-addressed store for large tool payloads kept in session history.
+
+    Function responses at or above `inline_limit` bytes are moved into the
+    store and the message keeps only a small reference. Identical payloads
+    are stored once, however many times or sessions they appear in. Past
+    `memory_limit` bytes the least recently used blobs spill to disk.
+    References are expanded only when a request is built.
+    """
+
+    def __init__(self, inline_limit=BLOB_INLINE_BYTES, memory_limit=BLOB_MEMORY_BYTES):
+        self.inline_limit = inline_limit
+        self.memory_limit = memory_limit
+        self._memory = OrderedDict()  # digest -> payload, least recently used first
+        self._memory_bytes = 0
+        self._spilled = {}  # digest -> path of the spill file
+        self._sizes = {}  # digest -> payload size in bytes
+        self._refs = {}  # digest -> {session: reference count}
+        self._sessions = {}  # session -> bytes referenced, counting duplicates
+        self._spill_dir = None
+        self._lock = threading.Lock()
+        self._observers = weakref.WeakSet()  # told when a payload leaves memory
+
+    # PAYLOADS
+    # ========
+
+    def put(self, payload, session):
+        """Store a string payload for a session and return its digest."""
+        data = payload.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest not in self._sizes:
+                self._sizes[digest] = len(data)
+                self._memory[digest] = payload
+                self._memory_bytes += len(data)
+                self._spill_if_needed()
+            elif digest in self._memory:
+                self._memory.move_to_end(digest)
+            counts = self._refs.setdefault(digest, {})
+            counts[session] = counts.get(session, 0) + 1
+            self._sessions[session] = self._sessions.get(session, 0) + len(data)
+        return digest
+
+    def get(self, digest):
+        """Return the payload stored under digest."""
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                return self._memory[digest]
+            path = self._spilled[digest]
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    def release(self, session):
+        """Drop every reference held by a session and free blobs nobody references."""
+        with self._lock:
+            self._sessions.pop(session, None)
+            for digest in list(self._refs):
+                counts = self._refs[digest]
+                counts.pop(session, None)
+                if not counts:
+                    self._forget(digest)
+
+    def usage(self, session=None):
+        """
+        Return byte accounting for one session, or for the whole store.
+
+        For a session, "referenced_bytes" counts every payload it stashed,
+        duplicates included, and "unique_bytes" counts each distinct payload once.
+        """
+        with self._lock:
+            stats = {
+                "memory_bytes": self._memory_bytes,
+                "spilled_bytes": sum(self._sizes[d] for d in self._spilled),
+                "blobs": len(self._sizes),
+            }
+            if session is not None:
+                stats["referenced_bytes"] = self._sessions.get(session, 0)
+                stats["unique_bytes"] = sum(
+                    self._sizes[d] for d, counts in self._refs.items() if session in counts
+                )
+            return stats
+
+    # MESSAGES
+    # ========
+
+    def stash(self, content, session):
+        """Return content with large function response values replaced by blob references."""
+        parts = []
+        changed = False
+        for part in content.parts or []:
+            response = part.function_response.response if part.function_response else None
+            if isinstance(response, dict):
+                stashed = {}
+                for key, value in response.items():
+                    if isinstance(value, str) and len(value.encode("utf-8")) >= self.inline_limit:
+                        digest = self.put(value, session)
+                        value = {BLOB_REF_KEY: digest, "bytes": self._sizes[digest]}
+                        changed = True
+                    stashed[key] = value
+                if stashed != response:
+                    part = _with_response(part, stashed)
+            parts.append(part)
+        return content.model_copy(update={"parts": parts}) if changed else content
+
+    def expand_content(self, content):
+        """Return a copy of content with blob references replaced by their payloads."""
+        parts = []
+        changed = False
+        for part in content.parts or []:
+            response = part.function_response.response if part.function_response else None
+            if isinstance(response, dict) and any(_is_ref(v) for v in response.values()):
+                expanded = {
+                    key: self.get(value[BLOB_REF_KEY]) if _is_ref(value) else value
+                    for key, value in response.items()
+                }
+                part = _with_response(part, expanded)
+                changed = True
+            parts.append(part)
+        return content.model_copy(update={"parts": parts}) if changed else content
+
+    def references(self, content):
+        """Return the digests of the blobs content refers to."""
+        return [
+            value[BLOB_REF_KEY]
+            for part in content.parts or []
+            if part.function_response and isinstance(part.function_response.response, dict)
+            for value in part.function_response.response.values()
+            if _is_ref(value)
+        ]
+
+    def resident(self, digests):
+        """Return True if every blob in digests is held in memory, not spilled or dropped."""
+        with self._lock:
+            return all(digest in self._memory for digest in digests)
+
+    def observe(self, observer):
+        """
+        Call observer.blob_evicted(digest) whenever a payload leaves memory,
+        by spilling to disk or being dropped. The call is made with the
+        store locked, so it must only take note. Observers are held weakly.
+        """
+        self._observers.add(observer)
+
+    def content_bytes(self, content):
+        """
+        Return the payload size content has once expanded: its text, call
+        arguments and response values, with each reference counted at the
+        size of its blob. Nothing is expanded or serialized to find it.
+        """
+        size = 0
+        for part in content.parts or []:
+            if part.text:
+                size += len(part.text.encode("utf-8"))
+            if part.function_call:
+                size += _value_bytes(part.function_call.args or {})
+            if part.function_response:
+                size += _value_bytes(part.function_response.response or {})
+        return size
+
+    # INTERNALS
+    # =========
+
+    def _spill_if_needed(self):
+        while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+            digest, payload = self._memory.popitem(last=False)
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix="agent-blobs-")
+            path = os.path.join(self._spill_dir, digest)
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(payload)
+            self._spilled[digest] = path
+            self._memory_bytes -= self._sizes[digest]
+            self._evicted(digest)
+
+    def _forget(self, digest):
+        del self._refs[digest]
+        size = self._sizes.pop(digest)
+        if digest in self._memory:
+            del self._memory[digest]
+            self._memory_bytes -= size
+            self._evicted(digest)
+        else:
+            os.remove(self._spilled.pop(digest))
+
+    def _evicted(self, digest):
+        for observer in list(self._observers):
+            observer.blob_evicted(digest)
+
+    def close(self):
+        """Drop every blob and remove the spill directory."""
+        with self._lock:
+            for digest in self._memory:
+                self._evicted(digest)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._spilled.clear()
+            self._sizes.clear()
+            self._refs.clear()
+            self._sessions.clear()
+            if self._spill_dir is not None:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+
+def _is_ref(value):
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def _value_bytes(value):
+    if _is_ref(value):
+        return value["bytes"]
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, dict):
+        return sum(len(str(key)) + _value_bytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_value_bytes(item) for item in value)
+    return len(str(value))
+
+
+def _with_response(part, response):
+    function_response = part.function_response.model_copy(update={"response": response})
+    return types.Part(function_response=function_response)
+
+
+# Shared by all sessions in the process so identical payloads are stored once
+blob_store = BlobStore()
+atexit.register(blob_store.close)
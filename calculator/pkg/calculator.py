@@ -22,6 +22,10 @@ class Calculator:
         tokens = expression.strip().split()
         return self._evaluate_infix(tokens)
 
+    def evaluate_tokens(self, tokens):
+        # Already split expression; operands may be numbers instead of strings
+        return self._evaluate_infix(tokens)
+
     def _evaluate_infix(self, tokens):
         values = []
         operators = []
@@ -0,0 +1,204 @@
+# session.py
+
+from pkg.calculator import Calculator
+
+# Words float() accepts; in a formula they are numbers, not cell names
+FLOAT_WORDS = {"inf", "infinity", "nan"}
+
+
+class CycleError(ValueError):
+    def __init__(self, cells):
+        self.cells = sorted(cells)
+        super().__init__(f"circular reference between cells: {', '.join(self.cells)}")
+
+
+class CalculatorSession:
+    """
+    Named cells whose formulas may refer to other cells, e.g. x = 3 * y + 2.
+
+    Each cell's value is cached. When cells change, only the cells that
+    depend on them, directly or indirectly, are recomputed, each once and
+    in dependency order. A change that would create a circular reference
+    raises CycleError and leaves the session as it was.
+    """
+
+    def __init__(self, calculator=None):
+        self.calculator = calculator or Calculator()
+        self.formulas = {}  # cell -> list of tokens
+        self._compiled = {}  # cell -> tokens with numbers already parsed to float
+        self.values = {}  # cell -> float, for cells that evaluated
+        self.errors = {}  # cell -> message, for cells that did not
+        self._dependencies = {}  # cell -> set of cells its formula refers to
+        self._dependents = {}  # cell -> set of cells whose formulas refer to it
+
+    def set(self, name, formula):
+        return self.update({name: formula})
+
+    def execute(self, line):
+        # "x = 3 * y + 2"
+        name, sep, formula = line.partition("=")
+        if not sep:
+            raise ValueError(f"expected <cell> = <formula>, got: {line}")
+        return self.set(name.strip(), formula)
+
+    def update(self, cells):
+        # Apply every change first, then recompute once, so a batch of
+        # related cells costs no more than a single pass over what they affect
+        parsed = {name: self._parse(name, formula) for name, formula in cells.items()}
+        previous = {
+            name: (self.formulas[name], self._compiled[name], self._dependencies[name])
+            for name in parsed
+            if name in self.formulas
+        }
+        for name, formula in parsed.items():
+            self._link(name, *formula)
+        try:
+            return self._recompute(parsed)
+        except CycleError:
+            for name in parsed:
+                if name in previous:
+                    self._link(name, *previous[name])
+                else:
+                    self._unlink(name)
+            raise
+
+    def delete(self, name):
+        if name not in self.formulas:
+            raise KeyError(name)
+        dependents = set(self._dependents.get(name, ()))
+        self._unlink(name)
+        # Cells that referred to it now refer to an undefined cell
+        return self._recompute(dependents)
+
+    def get(self, name):
+        if name in self.errors:
+            raise ValueError(f"cell {name}: {self.errors[name]}")
+        if name not in self.values:
+            raise KeyError(name)
+        return self.values[name]
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __contains__(self, name):
+        return name in self.formulas
+
+    def __len__(self):
+        return len(self.formulas)
+
+    def dependents(self, name):
+        return set(self._dependents.get(name, ()))
+
+    def _parse(self, name, formula):
+        # Returns (tokens, tokens with numbers parsed to float, referenced cells)
+        if not isinstance(name, str) or not _is_reference(name):
+            raise ValueError(f"invalid cell name: {name}")
+        if isinstance(formula, (int, float)):
+            return [repr(float(formula))], [float(formula)], set()
+        tokens = formula.split()
+        if not tokens:
+            raise ValueError(f"empty formula for cell {name}")
+        compiled = []
+        dependencies = set()
+        for token in tokens:
+            if token in self.calculator.operators:
+                compiled.append(token)
+            elif _is_reference(token):
+                compiled.append(token)
+                dependencies.add(token)
+            else:
+                try:
+                    compiled.append(float(token))
+                except ValueError:
+                    raise ValueError(f"invalid token: {token}")
+        return tokens, compiled, dependencies
+
+    def _link(self, name, tokens, compiled, dependencies):
+        self._unlink_dependencies(name)
+        self.formulas[name] = tokens
+        self._compiled[name] = compiled
+        self._dependencies[name] = dependencies
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(name)
+
+    def _unlink(self, name):
+        self._unlink_dependencies(name)
+        self.formulas.pop(name, None)
+        self._compiled.pop(name, None)
+        self.values.pop(name, None)
+        self.errors.pop(name, None)
+
+    def _unlink_dependencies(self, name):
+        for dependency in self._dependencies.pop(name, ()):
+            dependents = self._dependents[dependency]
+            dependents.discard(name)
+            if not dependents:
+                del self._dependents[dependency]
+
+    def _recompute(self, changed):
+        # Everything downstream of the changed cells
+        affected = set()
+        stack = [name for name in changed if name in self.formulas]
+        while stack:
+            name = stack.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            stack.extend(self._dependents.get(name, ()))
+
+        # Kahn's algorithm over the affected cells only; cells that never
+        # become ready are on a cycle, or downstream of one
+        waiting = {name: len(self._dependencies[name] & affected) for name in affected}
+        ready = [name for name, count in waiting.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self._dependents.get(name, ()):
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(affected):
+            raise CycleError(self._find_cycle(set(affected) - set(order)))
+
+        for name in order:
+            self._evaluate(name)
+        return order
+
+    def _evaluate(self, name):
+        tokens = self._compiled[name]
+        dependencies = self._dependencies[name]
+        if dependencies:
+            values = self.values
+            for dependency in dependencies:
+                if dependency not in values:
+                    self.values.pop(name, None)
+                    if dependency in self.errors:
+                        self.errors[name] = f"depends on cell {dependency}, which has an error"
+                    else:
+                        self.errors[name] = f"undefined cell: {dependency}"
+                    return
+            tokens = [values[token] if token in dependencies else token for token in tokens]
+        try:
+            self.values[name] = self.calculator.evaluate_tokens(tokens)
+            self.errors.pop(name, None)
+        except (ValueError, ZeroDivisionError) as e:
+            self.values.pop(name, None)
+            self.errors[name] = str(e) or type(e).__name__
+
+    def _find_cycle(self, blocked):
+        # Walk back along dependencies that are themselves blocked until a
+        # cell repeats; every blocked cell has at least one such dependency
+        start = next(iter(blocked))
+        seen = {}
+        path = []
+        name = start
+        while name not in seen:
+            seen[name] = len(path)
+            path.append(name)
+            name = next(d for d in self._dependencies[name] if d in blocked)
+        return path[seen[name] :]
+
+
+def _is_reference(token):
+    return token.isidentifier() and token.lower() not in FLOAT_WORDS
@@ -9,6 +9,7 @@ if __name__ == "__main__":
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from pkg.calculator import Calculator
+from pkg.session import CalculatorSession, CycleError
 
 
 class TestCalculator(unittest.TestCase):
@@ -52,5 +53,54 @@ class TestCalculator(unittest.TestCase):
             self.calculator.evaluate("+ 3")
 
 
+class TestCalculatorSession(unittest.TestCase):
+    def setUp(self):
+        self.session = CalculatorSession()
+
+    def test_cell_formula(self):
+        self.session.execute("y = 4")
+        self.session.execute("x = 3 * y + 2")
+        self.assertEqual(self.session["x"], 14)
+
+    def test_only_downstream_cells_recompute(self):
+        self.session.update({"a": "1", "b": "2", "c": "a + 1", "d": "c * 2", "e": "b * 2"})
+        recomputed = self.session.set("a", 5)
+        self.assertEqual(recomputed, ["a", "c", "d"])
+        self.assertEqual(self.session["d"], 12)
+        self.assertEqual(self.session["e"], 4)
+
+    def test_recompute_in_dependency_order(self):
+        self.session.update({"a": "1", "b": "a + 1", "c": "a + b", "d": "c + b"})
+        recomputed = self.session.set("a", 10)
+        self.assertLess(recomputed.index("b"), recomputed.index("c"))
+        self.assertLess(recomputed.index("c"), recomputed.index("d"))
+        self.assertEqual(self.session["d"], 32)
+
+    def test_cycle_is_rejected(self):
+        self.session.update({"x": "1", "y": "x + 1"})
+        with self.assertRaises(CycleError):
+            self.session.execute("x = y + 1")
+        self.assertEqual(self.session["x"], 1)
+        self.assertEqual(self.session["y"], 2)
+
+    def test_errors_propagate(self):
+        self.session.update({"a": "1 / 0", "b": "a + 1", "c": "missing + 1"})
+        with self.assertRaises(ValueError):
+            self.session.get("b")
+        with self.assertRaises(ValueError):
+            self.session.get("c")
+        self.session.update({"a": "4", "missing": "1"})
+        self.assertEqual(self.session["b"], 5)
+        self.assertEqual(self.session["c"], 2)
+
+    def test_large_sheet_change_touches_only_dependents(self):
+        cells = {f"in{i}": str(i) for i in range(100)}
+        cells.update({f"cell{i}": f"in{i % 100} * 2 + {i}" for i in range(100_000)})
+        self.session.update(cells)
+        recomputed = self.session.set("in7", 1)
+        self.assertEqual(len(recomputed), 1001)
+        self.assertEqual(self.session["cell107"], 109)
+
+
 if __name__ == "__main__":
     unittest.main()
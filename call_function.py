@@ -8,12 +8,38 @@ from functions.get_file_info import get_files_info
 from functions.run_python import run_python_file
 from functions.write_file import write_file
 from functions.get_file_content import get_file_content
+from functions.get_files_content import get_files_content
+from functions.get_file_outline import get_file_outline
+from functions.run_tests import run_tests
+from functions.get_changes import get_changes
+from functions.get_file_digests import get_file_digests
+from functions.evaluate_expression import evaluate_expression
+from functions.path_index import path_index
 
 # Import all the function schemas
 from functions.get_file_info import schema_get_files_info
 from functions.run_python import schema_run_python_file
 from functions.write_file import schema_write_file
 from functions.get_file_content import schema_get_file_content
+from functions.get_files_content import schema_get_files_content
+from functions.get_file_outline import schema_get_file_outline
+from functions.run_tests import schema_run_tests
+from functions.get_changes import schema_get_changes
+from functions.get_file_digests import schema_get_file_digests
+from functions.evaluate_expression import schema_evaluate_expression
+
+# Arguments holding paths to existing files or directories, per function:
+# name -> (argument, kind, whether it is a list). write_file is left out on
+# purpose, since writing to a path that does not exist yet is normal.
+PATH_ARGUMENTS = {
+    "get_files_info": ("directory", "dir", False),
+    "get_file_content": ("file_path", "file", False),
+    "get_files_content": ("file_paths", "file", True),
+    "get_file_outline": ("file_path", "file", False),
+    "run_python_file": ("file_path", "file", False),
+    "run_tests": ("changed_files", "file", True),
+    "get_file_digests": ("file_paths", "file", True),
+}
 
 available_functions = types.Tool(
     function_declarations=[
@@ -21,13 +47,19 @@ available_functions = types.Tool(
         schema_run_python_file,
         schema_write_file,
         schema_get_file_content,
+        schema_get_files_content,
+        schema_get_file_outline,
+        schema_run_tests,
+        schema_get_changes,
+        schema_get_file_digests,
+        schema_evaluate_expression,
     ]
 )
 
 
 def call_function(function_call_part, verbose=False):
     """
-    Handle the abstract task of calling one of our four functions.
+    Handle the abstract task of calling one of the functions in function_map.
 
     Args:
         function_call_part: types.FunctionCall with .name and .args properties
@@ -37,7 +69,8 @@ def call_function(function_call_part, verbose=False):
         types.Content with function response
     """
     function_name = function_call_part.name
-    args = function_call_part.args or {}
+    # Copy so injecting working_directory doesn't alter the call kept in the history
+    args = dict(function_call_part.args or {})
 
     # Print function call information based on verbose flag
     if verbose:
@@ -45,33 +78,31 @@ def call_function(function_call_part, verbose=False):
     else:
         print(f" - Calling function: {function_name}")
 
-    # Manually set working directory based on context
-    # For pkg directory operations, use WORKING_DIR from config
-    # For other operations, use current directory
-    if function_name == "get_files_info" and args.get("directory") == "pkg":
-        args["working_directory"] = WORKING_DIR
-    elif function_name == "get_file_content" and args.get("file_path") == "main.py":
-        args["working_directory"] = "."
-    elif function_name == "run_python_file" and args.get("file_path") == "tests.py":
-        args["working_directory"] = "."
-    elif function_name == "run_python_file" and args.get("file_path") == "main.py":
-        args["working_directory"] = "."
-    else:
-        args["working_directory"] = WORKING_DIR
-
-    # Handle files in the pkg subdirectory
-    # If get_file_content is called with calculator.py or render.py (without pkg/ prefix),
-    # adjust path to pkg/ when working in WORKING_DIR
-    if function_name == "get_file_content" and args.get("working_directory") == WORKING_DIR:
-        file_path = args.get("file_path", "")
-        # Only adjust if the path doesn't already start with pkg/
-        if file_path in ["calculator.py", "render.py"] and not file_path.startswith("pkg/"):
-            args["file_path"] = f"pkg/{file_path}"
+    # Every tool works inside WORKING_DIR; bare or partial paths such as
+    # "calculator.py" are resolved against the path index
+    args["working_directory"] = WORKING_DIR
+    ambiguous = _resolve_paths(function_name, args)
+    if ambiguous and not PATH_ARGUMENTS[function_name][2]:
+        return types.Content(
+            role="tool",
+            parts=[
+                types.Part.from_function_response(
+                    name=function_name,
+                    response={"result": "Error: " + ambiguous[0]},
+                )
+            ],
+        )
 
     # Dictionary mapping function names to actual functions
     function_map = {
         "get_files_info": get_files_info,
         "get_file_content": get_file_content,
+        "get_files_content": get_files_content,
+        "get_file_outline": get_file_outline,
+        "run_tests": run_tests,
+        "get_changes": get_changes,
+        "get_file_digests": get_file_digests,
+        "evaluate_expression": evaluate_expression,
         "write_file": write_file,
         "run_python_file": run_python_file,
     }
@@ -91,6 +122,10 @@ def call_function(function_call_part, verbose=False):
     try:
         # Call the function with unpacked keyword arguments
         function_result = function_map[function_name](**args)
+        # The other entries of a list were still used; say which ones need a longer path
+        if ambiguous:
+            notes = [f"Note: {message}, so it was left as given" for message in ambiguous]
+            function_result = "\n".join(notes + [function_result])
 
         # Return structured response
         return types.Content(
@@ -114,4 +149,35 @@ def call_function(function_call_part, verbose=False):
         )
 
 
+def _resolve_paths(function_name, args):
+    """
+    Replace bare or partial paths in args with the one path they refer to.
+
+    Paths that match nothing are left alone for the function to report, and
+    so are ambiguous entries of a list argument, so one of them does not
+    fail the whole call.
+
+    Returns:
+        list: A message listing the candidates for each ambiguous path
+    """
+    if function_name not in PATH_ARGUMENTS:
+        return []
+    name, kind, is_list = PATH_ARGUMENTS[function_name]
+    value = args.get(name)
+    if not value:
+        return []
+
+    resolved = []
+    ambiguous = []
+    for path in value if is_list else [value]:
+        matches = path_index.resolve(args["working_directory"], path, kind)
+        if len(matches) > 1:
+            ambiguous.append(f'"{path}" is ambiguous, it could be any of: ' + ", ".join(matches))
+            resolved.append(path)
+        else:
+            resolved.append(matches[0] if matches else path)
+    args[name] = resolved if is_list else resolved[0]
+    return ambiguous
+
+
 # Create the available_functions tool
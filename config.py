@@ -1,27 +1,110 @@
+import os
+
 MAX_CHARACTERS = 10000
+MAX_ITERATIONS = 20
+
+# get_files_content: combined size budget, file limit and read threads per call
+MAX_BATCH_CHARACTERS = 40000
+MAX_BATCH_FILES = 50
+READ_WORKERS = 8
+
+MAX_BATCH_EXPRESSIONS = 1000  # evaluate_expression: expressions per call
+
+# Wall-clock budget for one agent session; model and tool calls take their
+# timeouts from what is left of it. None means unbounded.
+SESSION_BUDGET_SECONDS = 300
+MODEL_CALL_TIMEOUT = 60  # Upper bound for a single model request, in seconds
+TEST_WORKERS = 4
+
+# Child process execution (run_python_file, run_tests)
+EXEC_SLOTS = 4  # Maximum number of child processes running at once
+EXEC_TIMEOUT = 30  # Wall-clock seconds before a child process tree is killed
+EXEC_CPU_SECONDS = 30  # RLIMIT_CPU for each child, None to disable
+EXEC_MEMORY_BYTES = 1024 * 1024 * 1024  # RLIMIT_AS for each child, None to disable
+EXEC_QUEUE_REPORT_SECONDS = 0.5  # Report queue time in tool output above this wait
+
+# Reuse run_python_file results for identical runs (same script, Python sources,
+# args and interpreter). Only enable for scripts whose output depends on nothing else.
+RUN_DEDUP = False
+RUN_CACHE_MAX_ENTRIES = 256
+RUN_CACHE_WAIT_SLICE = 0.1  # Seconds between session checks while waiting for an identical run
+
+# No-progress detection (progress.py): within the last PROGRESS_WINDOW tool calls, the
+# same call returning the same result PROGRESS_REPEAT_LIMIT times, or PROGRESS_ERROR_STREAK
+# failures in a row, get the model a nudge and, if it happens again, end the session.
+# 0 disables a check.
+PROGRESS_WINDOW = 6
+PROGRESS_REPEAT_LIMIT = 3
+PROGRESS_ERROR_STREAK = 4
+
+# Keep a session's writes in memory and commit them to disk when it ends
+# (or discard them if it fails). Child processes still see them on disk.
+WORKSPACE_OVERLAY = True
+
+# Tool payloads of at least BLOB_INLINE_BYTES are kept once in a shared blob store
+# and referenced from the session history; past BLOB_MEMORY_BYTES they spill to disk
+BLOB_INLINE_BYTES = 2048
+BLOB_MEMORY_BYTES = 64 * 1024 * 1024
 SYSTEM_PROMPT = """
 You are a helpful AI coding agent.
 
 When a user asks a question or makes a request, you MUST make a function call to perform the operation. You can perform the following operations:
 
 - List files and directories -> use get_files_info function
-- Read file contents -> use get_file_content function
+- Read file contents -> use get_file_content function (optionally only start_line to end_line)
+- Read several files at once, by list of paths or glob pattern -> use get_files_content function
+- Outline the classes and functions of a Python file -> use get_file_outline function
+- Get summaries, public APIs and outlines of files, cached across sessions -> use get_file_digests function
+- Find out which files changed since a snapshot -> use get_changes function
+- Evaluate arithmetic expressions with the calculator, one or many at once -> use evaluate_expression function
 - Execute Python files with optional arguments -> use run_python_file function
+- Run unittest tests, optionally only selected tests or those affected by changed files -> use run_tests function
 - Write or overwrite files -> use write_file function
 
 All paths you provide should be relative to the working directory. You do not need to specify the working directory in your function calls as it is automatically injected for security reasons.
 
 IMPORTANT:
 1. ALWAYS make a function call when the user requests any of these operations. Do not ask for clarification - just call the appropriate function with the required parameters.
-2. When exploring code to answer questions about how something works, FIRST use get_files_info to explore the directory structure, THEN read relevant files with get_file_content.
+2. When exploring code to answer questions about how something works, FIRST use get_files_info to explore the directory structure, THEN use get_file_outline on Python files and read only the line ranges you need with get_file_content.
 3. Continue making function calls until you have gathered enough information to provide a complete answer.
+4. To see what changed after writing files or running code, call get_changes with the latest snapshot ID instead of listing and reading everything again.
 
 EXAMPLES:
 - "run tests.py" -> call run_python_file with file_path="tests.py"
+- "what is 3 + 5?" -> call evaluate_expression with expression="3 + 5"
+- "run the tests affected by my change to pkg/render.py" -> call run_tests with changed_files=["pkg/render.py"]
 - "list directory contents" -> call get_files_info with directory="."
 - "read main.py" -> call get_file_content with file_path="main.py"
+- "show me all the modules in pkg" -> call get_files_content with pattern="pkg/*.py"
+- "what is in calculator.py?" -> call get_file_outline with file_path="pkg/calculator.py"
 - "write hello to file.txt" -> call write_file with file_path="file.txt", content="hello"
 - "how does X work?" -> FIRST call get_files_info to explore, THEN call get_file_content on relevant files
 """
 MODEL = "gemini-2.0-flash-001"
-WORKING_DIR = "./calculator"
\ No newline at end of file
+
+# Run prompts that map directly onto one tool call (see fast_path.py) before the
+# first model request, so the model sees the result in that same request
+FAST_PATH = True
+
+# Tiered model routing: tool-selection turns go to FAST_MODEL, and the loop
+# escalates to STRONG_MODEL for the final answer, after tool error streaks,
+# after the tools in ROUTE_TOOL_TIERS and on the iterations in ROUTE_ITERATION_TIERS.
+MODEL_ROUTING = True
+FAST_MODEL = "gemini-2.0-flash-lite-001"
+STRONG_MODEL = MODEL
+ROUTE_TOOL_TIERS = {"run_tests": "strong"}  # tool name -> tier of the turn reading its result
+ROUTE_ITERATION_TIERS = {}  # 0-based iteration -> "fast" or "strong"
+ROUTE_ESCALATE_AFTER_ERRORS = 2  # Consecutive tool errors before escalating, 0 to disable
+ROUTE_STRONG_SYNTHESIS = True  # Have STRONG_MODEL write final answers that took more than one tool call
+WORKING_DIR = "./calculator"
+
+# On-disk caches shared across sessions
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".agent_cache")
+SNAPSHOT_KEEP = 50  # Number of working directory snapshots kept in CACHE_DIR
+SNAPSHOT_ON_START = True  # Tell the model what changed in WORKING_DIR since the last session
+DIGEST_KEEP = 1000  # Number of file digests kept in CACHE_DIR
+DIGESTS_ON_START = True  # Start each session with a digest of every Python file
+
+# --profile output: pstats, collapsed stacks and allocation report per session
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".agent_profile")
+PROFILE_TOP_N = 25  # Allocation sites listed in the report
@@ -0,0 +1,88 @@
+import time
+from collections import deque
+
+
+class Conversation:
+    """
+    Message history of one session, with each entry's request-ready form cached.
+
+    History entries never change once appended, so turning an entry into
+    what a request carries is done once, the first time a request includes
+    it. Entries holding blob references are cached expanded while all their
+    blobs are in the blob store's memory: the cached copy then shares the
+    payloads with the store and costs no payload memory of its own. When
+    one of those blobs spills to disk or is dropped, the store tells the
+    conversation and the entry falls back to its compact form, expanded
+    again for each request, so spilled payloads are not held in memory.
+
+    `stats` gets one entry per request built: the number of contents, how
+    many of them were new, how many were expanded, the payload size of the
+    request contents (see BlobStore.content_bytes) and the seconds spent
+    preparing them.
+    """
+
+    def __init__(self, blob_store, contents=()):
+        self.blob_store = blob_store
+        self.messages = []  # compact history, large payloads as blob references
+        self.stats = []
+        self._contents = []  # request-ready form of messages[: len(self._contents)]
+        self._stale = set()  # indexes in _contents that still hold the compact form
+        self._users = {}  # digest -> indexes in _contents holding its payload
+        self._evicted = deque()  # digests that left blob store memory since the last request
+        self._payload_bytes = 0
+        blob_store.observe(self)
+        for content in contents:
+            self.append(content)
+
+    def append(self, content):
+        """Add an entry; it must not be modified afterwards."""
+        self.messages.append(content)
+
+    def blob_evicted(self, digest):
+        # Called by the blob store, possibly from another session's thread
+        self._evicted.append(digest)
+
+    def request_contents(self):
+        """Return the contents for the next request, preparing only new entries and those whose blobs spilled."""
+        started = time.perf_counter()
+        while self._evicted:
+            for index in self._users.pop(self._evicted.popleft(), ()):
+                self._contents[index] = self.messages[index]
+                self._stale.add(index)
+
+        new = self.messages[len(self._contents) :]
+        for content in new:
+            self._payload_bytes += self.blob_store.content_bytes(content)
+            if self.blob_store.references(content):
+                self._stale.add(len(self._contents))
+            self._contents.append(content)
+
+        contents = list(self._contents)
+        stale = list(self._stale)
+        for index in stale:
+            contents[index] = self._expand(index)
+        self.stats.append(
+            {
+                "contents": len(contents),
+                "new": len(new),
+                "expanded": len(stale),
+                "bytes": self._payload_bytes,
+                "seconds": time.perf_counter() - started,
+            }
+        )
+        return contents
+
+    def _expand(self, index):
+        content = self.messages[index]
+        digests = self.blob_store.references(content)
+        expanded = self.blob_store.expand_content(content)
+        if self.blob_store.resident(digests):
+            # Cache it; an eviction notice from now on turns it back into the compact form
+            self._contents[index] = expanded
+            self._stale.discard(index)
+            for digest in digests:
+                self._users.setdefault(digest, set()).add(index)
+        return expanded
+
+    def __len__(self):
+        return len(self.messages)
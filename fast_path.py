@@ -0,0 +1,79 @@
+import re
+import shlex
+
+from google.genai import types
+
+# Prompts that map directly onto one read-only tool call, like the EXAMPLES in
+# SYSTEM_PROMPT. Each entry is (pattern, function name, argument builder).
+# write_file is deliberately left out: its content is too easy to mis-extract.
+_PATH = r"[\w./-]+"
+
+FAST_PATHS = [
+    (
+        re.compile(rf"^run\s+(?:the\s+)?(?P<file_path>{_PATH}\.py)(?:\s+(?:with\s+(?:args?|arguments)\s+)?(?P<args>.+))?$", re.I),
+        "run_python_file",
+        lambda m: {"file_path": m["file_path"], **({"args": shlex.split(m["args"])} if m["args"] else {})},
+    ),
+    (
+        re.compile(r"^(?:calculate|evaluate|compute|what\s+is)\s+(?P<expression>[-+*/.\d\s]*\d[-+*/.\d\s]*?)\s*\??$", re.I),
+        "evaluate_expression",
+        lambda m: {"expression": " ".join(_expression_tokens(m["expression"]))},
+    ),
+    (
+        re.compile(r"^run\s+(?:all\s+)?(?:the\s+)?(?:unit\s*)?tests$", re.I),
+        "run_tests",
+        lambda m: {},
+    ),
+    (
+        re.compile(rf"^(?:read|show|cat|print|open)\s+(?:the\s+)?(?:contents?\s+of\s+)?(?P<file_path>{_PATH}\.\w+)$", re.I),
+        "get_file_content",
+        lambda m: {"file_path": m["file_path"]},
+    ),
+    (
+        re.compile(rf"^(?:outline|summari[sz]e the structure of)\s+(?P<file_path>{_PATH}\.py)$", re.I),
+        "get_file_outline",
+        lambda m: {"file_path": m["file_path"]},
+    ),
+    (
+        re.compile(rf"^(?:list|show)\s+(?:the\s+)?(?:directory\s+)?(?:contents|files)(?:\s+(?:of|in)\s+(?:the\s+)?(?P<directory>{_PATH}?)(?:\s+directory)?)?$", re.I),
+        "get_files_info",
+        lambda m: {"directory": m["directory"] or "."},
+    ),
+]
+
+
+_OPERATORS = {"+", "-", "*", "/"}
+
+
+def _expression_tokens(expression):
+    # The calculator needs spaces between tokens: "3+5" -> "3 + 5". A minus at
+    # the start or right after an operator is the sign of the number that
+    # follows and stays attached to it: "-3+5" -> "-3 + 5", "2*-1" -> "2 * -1"
+    tokens = []
+    for token in re.findall(r"\d*\.?\d+|[-+*/]", expression):
+        unary = tokens[-1:] == ["-"] and (len(tokens) == 1 or tokens[-2] in _OPERATORS)
+        if unary and token not in _OPERATORS:
+            tokens[-1] += token
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def match_fast_path(user_prompt):
+    """
+    Match a prompt against FAST_PATHS.
+
+    Returns:
+        types.FunctionCall: The single tool call the prompt asks for, or None
+    """
+    prompt = user_prompt.strip().rstrip(".!")
+    for pattern, name, build_args in FAST_PATHS:
+        match = pattern.match(prompt)
+        if match:
+            try:
+                args = build_args(match)
+            except ValueError:
+                # e.g. unbalanced quotes in the arguments; let the model handle it
+                continue
+            return types.FunctionCall(name=name, args=args)
+    return None
@@ -0,0 +1,216 @@
+import ast
+import hashlib
+import json
+import os
+import sys
+import threading
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CACHE_DIR, DIGEST_KEEP
+from functions.symbol_index import format_outline, parse_symbols
+from functions.workspace import workspace
+
+SKIPPED_DIRS = {"__pycache__"}
+# Bump when the digest format changes, so older cache entries are ignored
+DIGEST_VERSION = 2
+
+
+class DigestCache:
+    """
+    On-disk cache of file digests: a short summary, the public API and the
+    outline of each file, keyed by the SHA-256 of its content and the kind
+    of digest its name calls for (Python or plain text).
+
+    Entries are shared by every session, so an unchanged file is only
+    digested once. A changed file has a new hash and therefore misses the
+    cache; its old entry is left to be pruned. Within a process the hash of
+    each file is also remembered with its mtime and size, so unchanged files
+    are not even re-read.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, keep=DIGEST_KEEP):
+        self.directory = os.path.join(cache_dir, "digests")
+        self.keep = keep
+        self._hashes = {}  # abs path -> ((mtime_ns, size), sha256)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        """
+        Return the digest of a file, from the cache if its content was digested before.
+
+        Returns:
+            dict: {"sha256", "lines", "summary", "api": [...], "outline": [...]}
+
+        Raises:
+            OSError, UnicodeDecodeError: If the file cannot be read as text
+        """
+        abs_path = os.path.abspath(path)
+        source = workspace.overlay_text(abs_path)
+        if source is not None:
+            sha256 = _sha256(source)
+        else:
+            stat = os.stat(abs_path)
+            key = (stat.st_mtime_ns, stat.st_size)
+            with self._lock:
+                cached = self._hashes.get(abs_path)
+            if cached and cached[0] == key:
+                sha256 = cached[1]
+            else:
+                source = workspace.read_text(abs_path)
+                sha256 = _sha256(source)
+                with self._lock:
+                    self._hashes[abs_path] = (key, sha256)
+
+        # The same content digests differently as Python source and as text
+        kind = "py" if abs_path.endswith(".py") else "text"
+        entry_path = os.path.join(self.directory, f"{sha256}-{kind}.json")
+        digest = _read_json(entry_path)
+        if digest is not None and digest.get("v") == DIGEST_VERSION:
+            with self._lock:
+                self.hits += 1
+            return digest
+
+        if source is None:
+            source = workspace.read_text(abs_path)
+        digest = build_digest(source, abs_path)
+        digest["sha256"] = sha256
+        with self._lock:
+            self.misses += 1
+            os.makedirs(self.directory, exist_ok=True)
+            _write_json(entry_path, digest)
+            self._prune()
+        return digest
+
+    def _prune(self):
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+        if len(files) <= self.keep:
+            return
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[self.keep :]:
+            os.remove(path)
+
+
+def build_digest(source, path):
+    """Digest one file's content. Python files get an API list and outline; others only a summary."""
+    lines = source.count("\n") + (0 if source.endswith("\n") or not source else 1)
+    digest = {"v": DIGEST_VERSION, "lines": lines, "summary": "", "api": [], "outline": []}
+    if not path.endswith(".py"):
+        first = next((line.strip() for line in source.splitlines() if line.strip()), "")
+        digest["summary"] = first[:200]
+        return digest
+
+    try:
+        tree = ast.parse(source, filename=path)
+        symbols = parse_symbols(source, filename=path)
+    except SyntaxError as e:
+        digest["summary"] = f"Does not parse: {e.msg} (line {e.lineno})"
+        return digest
+
+    exported = _dunder_all(tree)
+    for symbol in symbols:
+        if not _is_public(symbol["name"], exported):
+            continue
+        digest["api"].append(f"{symbol['kind']} {symbol['name']}{symbol['signature']}")
+        if symbol["kind"] == "class":
+            for child in symbol["children"]:
+                # Public methods, plus __init__ since it gives the constructor's signature
+                if child["name"] == "__init__" or not child["name"].startswith("_"):
+                    digest["api"].append(f"    {child['kind']} {child['name']}{child['signature']}")
+    digest["outline"] = format_outline(symbols)
+    digest["summary"] = _summary(source, tree, symbols)
+    return digest
+
+
+def _summary(source, tree, symbols):
+    # Prefer what the author wrote: the module docstring, else a leading comment block
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        return " ".join(docstring.strip().split("\n\n")[0].split())[:300]
+    comments = []
+    for line in source.splitlines():
+        if not line.startswith("#"):
+            break
+        text = line.lstrip("#").strip()
+        # Skip shebangs, encoding lines and comments that are only a file name
+        # (not just this file's, so the digest depends on nothing but the content)
+        if text and not text.startswith("!") and "coding" not in text and not _is_file_name(text):
+            comments.append(text)
+    if comments:
+        return " ".join(comments)[:300]
+
+    names = [f"{s['kind']} {s['name']}" for s in symbols if not s["name"].startswith("_")]
+    if names:
+        return "Defines " + ", ".join(names[:8]) + (", ..." if len(names) > 8 else "")
+    return "Script without classes or functions"
+
+
+def _is_file_name(text):
+    return " " not in text and text.endswith(".py")
+
+
+def _dunder_all(tree):
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets
+        ):
+            try:
+                return set(ast.literal_eval(node.value))
+            except ValueError:
+                return None
+    return None
+
+
+def _is_public(name, exported):
+    if exported is not None:
+        return name in exported
+    return not name.startswith("_")
+
+
+def python_files(working_directory):
+    """List the Python files under working_directory, relative to it, including pending writes."""
+    root = os.path.abspath(working_directory)
+    found = []
+
+    def walk(directory, relative):
+        for name in workspace.listdir(directory):
+            if name.startswith(".") or name in SKIPPED_DIRS:
+                continue
+            path = os.path.join(directory, name)
+            if workspace.isdir(path):
+                walk(path, f"{relative}{name}/")
+            elif name.endswith(".py"):
+                found.append(f"{relative}{name}")
+
+    walk(root, "")
+    return sorted(found)
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+# Shared so every tool call and session start use the same in-process hash memo
+digest_cache = DigestCache()
@@ -0,0 +1,251 @@
+import hashlib
+import importlib.util
+import os
+import os.path
+import subprocess
+import sys
+import threading
+
+from google.genai import types
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EXEC_TIMEOUT, MAX_BATCH_EXPRESSIONS, WORKING_DIR
+from functions.run_python import run_python_file
+from functions.scheduler import scheduler
+from functions.workspace import workspace
+
+# The calculator modules the tool loads, relative to the working directory
+CALCULATOR_MODULES = {"calculator": "pkg/calculator.py", "render": "pkg/render.py"}
+
+
+class CalculatorRuntime:
+    """
+    A warm Calculator and format_json_output, loaded once into the agent process.
+
+    The sources are only ever loaded in process while they match the
+    versions committed to git at HEAD. Once they differ, whether edited
+    by this session (on disk or pending in the workspace) or committed to
+    disk by an earlier one, load() returns None and the caller falls back
+    to running main.py in a child process. The results then reflect the
+    edit, and code the model wrote never runs outside the sandbox.
+    """
+
+    def __init__(self, working_directory):
+        self.root = os.path.abspath(working_directory)
+        self._stats = {}  # abs path -> ((mtime_ns, size), git blob id)
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._baseline = None  # git blob ids at HEAD, read on first load()
+        self._baseline_read = False
+
+    def untrusted_reason(self):
+        """Return why the sources cannot be loaded in process, or None if they can."""
+        baseline = self._trusted_fingerprint()
+        if baseline is None:
+            return "the calculator sources are not committed to git, or git is unavailable"
+        if self._fingerprint() != baseline:
+            return "the calculator sources differ from the version committed to git"
+        return None
+
+    def load(self):
+        """Return (Calculator instance, format_json_output), or None if the sources are not the committed ones."""
+        if self.untrusted_reason() is not None:
+            return None
+        return self._import()
+
+    def _import(self):
+        with self._lock:
+            if self._loaded is None:
+                modules = {
+                    name: _load_module(f"_agent_{name}", os.path.join(self.root, path))
+                    for name, path in CALCULATOR_MODULES.items()
+                }
+                self._loaded = (
+                    modules["calculator"].Calculator(),
+                    modules["render"].format_json_output,
+                )
+            return self._loaded
+
+    def _trusted_fingerprint(self):
+        # Nothing outside the agent's reach says which sources are trusted
+        # unless they are committed; without git the tool always falls back
+        with self._lock:
+            if not self._baseline_read:
+                self._baseline_read = True
+                try:
+                    result = subprocess.run(
+                        ["git", "rev-parse", *(f"HEAD:./{path}" for path in CALCULATOR_MODULES.values())],
+                        cwd=self.root,
+                        capture_output=True,
+                        text=True,
+                        timeout=10,
+                    )
+                except (OSError, subprocess.SubprocessError):
+                    result = None
+                if result is not None and result.returncode == 0:
+                    self._baseline = tuple(result.stdout.split())
+            return self._baseline
+
+    def _fingerprint(self):
+        hashes = []
+        for path in CALCULATOR_MODULES.values():
+            abs_path = os.path.join(self.root, path)
+            pending = workspace.overlay_text(abs_path)
+            if pending is not None:
+                hashes.append(_git_blob_id(pending.encode("utf-8")))
+                continue
+            try:
+                stat = os.stat(abs_path)
+            except OSError:
+                return None
+            key = (stat.st_mtime_ns, stat.st_size)
+            with self._lock:
+                cached = self._stats.get(abs_path)
+            if cached is None or cached[0] != key:
+                with open(abs_path, "rb") as file:
+                    cached = (key, _git_blob_id(file.read()))
+                with self._lock:
+                    self._stats[abs_path] = cached
+            hashes.append(cached[1])
+        return tuple(hashes)
+
+
+def _git_blob_id(data):
+    # The object id git gives this content, as printed by `git rev-parse HEAD:<path>`
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def evaluate_expression(working_directory, expression=None, expressions=None):
+    """
+    Evaluate calculator expressions with the calculator in the working directory.
+
+    This function is designed to be safe for LLM agents by:
+    1. Only using the calculator inside the working directory (security)
+    2. Always returning strings (LLM-friendly)
+    3. Handling all errors gracefully, per expression
+    4. Running modified calculator code in a child process, never in the agent
+
+    Args:
+        working_directory (str): The base directory that acts as a security boundary
+        expression (str): One expression, e.g. "3 + 5"
+        expressions (list): Several expressions, evaluated in one call
+
+    Returns:
+        str: main.py's JSON output for one expression, one JSON line per
+            expression for several, or an error message
+    """
+
+    # STEP 1: VALIDATE THE INPUT
+    # ==========================
+
+    batch = list(expressions or [])
+    if expression is not None:
+        batch.insert(0, expression)
+    if not batch:
+        return "Error: Give an expression or a list of expressions"
+    if len(batch) > MAX_BATCH_EXPRESSIONS:
+        return f"Error: At most {MAX_BATCH_EXPRESSIONS} expressions per call, got {len(batch)}"
+
+    # STEP 2: GET THE WARM CALCULATOR
+    # ===============================
+
+    runtime = calculator_runtime if os.path.abspath(working_directory) == calculator_runtime.root else None
+    reason = runtime.untrusted_reason() if runtime else "this is not the agent's own calculator"
+    if reason is not None:
+        # Untrusted calculator code: run it the way main.py would, sandboxed
+        if len(batch) == 1:
+            note = f"[Evaluated by running main.py, because {reason}]"
+            return "\n\n".join([note, run_python_file(working_directory, "main.py", batch)])
+        note = f"[Evaluated in a child process, because {reason}]"
+        return "\n".join([note, _evaluate_in_child(working_directory, batch)])
+
+    try:
+        loaded = runtime._import()
+    except Exception as e:
+        return f"Error: Cannot load the calculator: {e}"
+
+    # STEP 3: EVALUATE IN PROCESS
+    # ===========================
+
+    calculator, format_json_output = loaded
+    # One expression gets main.py's exact output; a batch gets one compact JSON line each
+    indent = 2 if len(batch) == 1 else None
+    lines = []
+    for item in batch:
+        try:
+            result = calculator.evaluate(item)
+            lines.append(format_json_output(item, result, indent=indent))
+        except Exception as e:
+            lines.append(f"Error: {e}")
+    return "\n".join(lines)
+
+
+# Evaluates argv[1:] like STEP 3 does for a batch, with the calculator in the current directory
+_BATCH_SCRIPT = """
+import sys
+sys.path.insert(0, ".")
+from pkg.calculator import Calculator
+from pkg.render import format_json_output
+calculator = Calculator()
+for expression in sys.argv[1:]:
+    try:
+        print(format_json_output(expression, calculator.evaluate(expression), indent=None))
+    except Exception as e:
+        print(f"Error: {e}")
+"""
+
+
+def _evaluate_in_child(working_directory, batch):
+    # One sandboxed process for the whole batch, not one per expression
+    try:
+        # The child process reads from disk, so put pending session writes there first
+        workspace.materialize()
+        result = scheduler.run(
+            ["python", "-c", _BATCH_SCRIPT, *batch], cwd=working_directory, timeout=EXEC_TIMEOUT
+        )
+    except subprocess.TimeoutExpired as e:
+        return f"Error: evaluating {len(batch)} expressions: timeout after {e.timeout:g} seconds"
+    except Exception as e:
+        return f"Error: evaluating {len(batch)} expressions: {e}"
+    output_parts = [result.stdout.rstrip("\n")] if result.stdout.strip() else []
+    if result.returncode != 0:
+        output_parts.append(f"STDERR: {result.stderr}")
+        output_parts.append(f"Process exited with code {result.returncode}")
+    return "\n".join(output_parts)
+
+
+# Shared by all sessions; the calculator modules are loaded at most once per process
+calculator_runtime = CalculatorRuntime(WORKING_DIR)
+
+
+schema_evaluate_expression = types.FunctionDeclaration(
+    name="evaluate_expression",
+    description=(
+        "Evaluates arithmetic expressions such as \"3 + 5\" with the project's calculator "
+        "and returns the same JSON main.py prints. Much faster than running main.py. "
+        "Pass expressions to evaluate many in one call."
+    ),
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "expression": types.Schema(
+                type=types.Type.STRING,
+                description="The expression to evaluate, with spaces between tokens, e.g. \"3 * 4 + 5\".",
+            ),
+            "expressions": types.Schema(
+                type=types.Type.ARRAY,
+                items=types.Schema(type=types.Type.STRING),
+                description="Several expressions to evaluate in one call.",
+            ),
+        },
+    ),
+)
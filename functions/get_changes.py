@@ -0,0 +1,73 @@
+import os
+import os.path
+import sys
+
+from google.genai import types
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions.snapshot import snapshot_store
+
+
+def get_changes(working_directory, since=None):
+    """
+    Report which files changed in the working directory since a snapshot.
+
+    This function is designed to be safe for LLM agents by:
+    1. Only looking inside the working directory (security)
+    2. Always returning strings (LLM-friendly)
+    3. Handling all errors gracefully
+    4. Listing only added, removed and modified files instead of whole directory trees
+
+    Args:
+        working_directory (str): The base directory that acts as a security boundary
+        since (str): Snapshot ID returned by an earlier call; if omitted, only a new
+            snapshot is taken
+
+    Returns:
+        str: The new snapshot ID and the changed files, or an error message
+    """
+
+    if not os.path.isdir(working_directory):
+        return f'Error: "{working_directory}" is not a directory'
+
+    try:
+        if not since:
+            snapshot_id = snapshot_store.take(working_directory)
+            return (
+                f"Snapshot {snapshot_id} taken. "
+                f'Call get_changes with since="{snapshot_id}" later to list what changed.'
+            )
+
+        try:
+            snapshot_id, changes = snapshot_store.changes(working_directory, since)
+        except KeyError:
+            return f'Error: Unknown snapshot "{since}"'
+
+    except OSError as e:
+        return f"Error: {e}"
+
+    if not any(changes.values()):
+        return f"No changes since snapshot {since} (current snapshot: {snapshot_id})."
+
+    lines = [f"Changes since snapshot {since} (current snapshot: {snapshot_id}):"]
+    for kind in ("added", "modified", "removed"):
+        for path in changes[kind]:
+            lines.append(f"- {kind}: {path}")
+    return "\n".join(lines)
+
+
+schema_get_changes = types.FunctionDeclaration(
+    name="get_changes",
+    description="Lists the files added, modified or removed in the working directory since an earlier snapshot, and returns a new snapshot ID. Call it without since to take a snapshot. Use it instead of re-listing and re-reading files to find out what changed.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "since": types.Schema(
+                type=types.Type.STRING,
+                description="Snapshot ID from an earlier get_changes call or from the start of the session.",
+            ),
+        },
+    ),
+)
@@ -5,12 +5,13 @@ import sys
 from google.genai import types
 
 from config import MAX_CHARACTERS
+from functions.workspace import workspace
 
 # Add the parent directory to the path so we can import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-def get_file_content(working_directory, file_path):
+def get_file_content(working_directory, file_path, start_line=None, end_line=None):
     """
     Get the content of a file within a specified working directory.
 
@@ -23,6 +24,8 @@ def get_file_content(working_directory, file_path):
     Args:
         working_directory (str): The base directory that acts as a security boundary
         file_path (str): The path to the file to read within the working directory
+        start_line (int): Optional first line to return (1-based, inclusive)
+        end_line (int): Optional last line to return (1-based, inclusive)
 
     Returns:
         str: Either the file content (possibly truncated) or an error message
@@ -46,18 +49,24 @@ def get_file_content(working_directory, file_path):
     # =========================
 
     # Check if the path actually exists and is a file
-    if not os.path.isfile(target_file):
+    # (the workspace also knows files written earlier in this session)
+    if not workspace.isfile(target_file):
         return f'Error: "{file_path}" is not a file'
 
     # STEP 3: READ FILE CONTENT
     # =========================
 
     try:
-        # Open the file in read mode with UTF-8 encoding
-        # This handles text files properly across different systems
-        with open(target_file, "r", encoding="utf-8") as file:
-            # Read the entire content of the file
-            content = file.read()
+        # Read the file as UTF-8 text, from the session's pending writes if it has
+        # been written in this session, otherwise from disk
+        content = workspace.read_text(target_file)
+
+        # Narrow the content to the requested line range, e.g. one taken from get_file_outline
+        if start_line is not None or end_line is not None:
+            lines = content.splitlines(keepends=True)
+            first = max(int(start_line or 1), 1)
+            last = int(end_line) if end_line is not None else len(lines)
+            content = "".join(lines[first - 1 : last])
 
         # Check if the file is longer than our character limit
         # If so, truncate it and add a message
@@ -104,6 +113,14 @@ schema_get_file_content = types.FunctionDeclaration(
             "file_path": types.Schema(
                 type=types.Type.STRING, description="The path to the file to read."
             ),
+            "start_line": types.Schema(
+                type=types.Type.INTEGER,
+                description="Optional first line to read (1-based). Use with line ranges from get_file_outline.",
+            ),
+            "end_line": types.Schema(
+                type=types.Type.INTEGER,
+                description="Optional last line to read (1-based, inclusive).",
+            ),
         },
     ),
 )
@@ -0,0 +1,129 @@
+import os
+import os.path
+import sys
+
+from google.genai import types
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MAX_CHARACTERS
+from functions.digest_cache import digest_cache, python_files
+from functions.workspace import workspace
+
+
+def get_file_digests(working_directory, file_paths=None):
+    """
+    Get cached digests (summary, public API and outline) of files in a working directory.
+
+    This function is designed to be safe for LLM agents by:
+    1. Preventing access outside the working directory (security)
+    2. Always returning strings (LLM-friendly)
+    3. Handling all errors gracefully, per file
+    4. Returning digests kept across sessions instead of full file contents
+
+    Args:
+        working_directory (str): The base directory that acts as a security boundary
+        file_paths (list): Paths of the files to digest; every Python file if omitted
+
+    Returns:
+        str: One digest per file, or an error message
+    """
+
+    abs_working_dir = os.path.abspath(working_directory)
+    if not file_paths:
+        file_paths = python_files(abs_working_dir)
+        if not file_paths:
+            return "No Python files in the working directory"
+
+    sections = []
+    for file_path in file_paths:
+        target_file = os.path.abspath(os.path.join(working_directory, file_path))
+
+        # SECURITY CHECK: Ensure the requested path stays within working directory boundaries
+        if not target_file.startswith(abs_working_dir):
+            sections.append(
+                f'Error: Cannot digest "{file_path}" as it is outside the permitted working directory'
+            )
+            continue
+        if not workspace.isfile(target_file):
+            sections.append(f'Error: "{file_path}" is not a file')
+            continue
+
+        try:
+            digest = digest_cache.get(target_file)
+        except UnicodeDecodeError:
+            sections.append(f'Error: Cannot read "{file_path}" as text')
+            continue
+        except OSError as e:
+            sections.append(f"Error: {e}")
+            continue
+        sections.append(format_digest(file_path, digest))
+
+    result = "\n\n".join(sections)
+    if len(result) > MAX_CHARACTERS:
+        result = result[:MAX_CHARACTERS] + (
+            f"\n\n[Digests truncated at {MAX_CHARACTERS} characters; ask for fewer files]"
+        )
+    return result
+
+
+def format_digest(file_path, digest):
+    lines = [f"{file_path} ({digest['lines']} lines, sha256 {digest['sha256'][:12]})"]
+    lines.append(f"Summary: {digest['summary']}")
+    if digest["api"]:
+        lines.append("Public API:")
+        lines.extend(f"  {entry}" for entry in digest["api"])
+    if digest["outline"]:
+        lines.append("Outline:")
+        lines.extend(f"  {line}" for line in digest["outline"])
+    return "\n".join(lines)
+
+
+def digest_overview(working_directory, max_characters=MAX_CHARACTERS):
+    """
+    One line per Python file with its summary and public names, for the first request of a session.
+
+    Returns:
+        str: The overview, or None if there are no Python files
+    """
+    lines = []
+    for file_path in python_files(working_directory):
+        try:
+            digest = digest_cache.get(os.path.join(working_directory, file_path))
+        except (OSError, UnicodeDecodeError):
+            continue
+        names = [entry.split("(")[0].split()[-1] for entry in digest["api"] if not entry.startswith(" ")]
+        line = f"- {file_path} ({digest['lines']} lines): {digest['summary']}"
+        if names:
+            line += f" [public: {', '.join(names)}]"
+        lines.append(line)
+    if not lines:
+        return None
+    overview = (
+        "Digests of the Python files in the working directory, cached by content hash "
+        "(call get_file_digests for outlines with line ranges):\n" + "\n".join(lines)
+    )
+    if len(overview) > max_characters:
+        overview = overview[:max_characters] + "\n[Overview truncated]"
+    return overview
+
+
+schema_get_file_digests = types.FunctionDeclaration(
+    name="get_file_digests",
+    description=(
+        "Returns a short summary, the public API and an outline with line ranges for files "
+        "in the working directory, cached across sessions by content hash. Much cheaper than "
+        "reading the files. Without file_paths, covers every Python file."
+    ),
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "file_paths": types.Schema(
+                type=types.Type.ARRAY,
+                items=types.Schema(type=types.Type.STRING),
+                description="The paths of the files to digest. Omit for every Python file.",
+            ),
+        },
+    ),
+)
@@ -1,4 +1,10 @@
 import os
+import sys
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions.workspace import workspace
 
 
 def get_files_info(working_directory, directory="."):
@@ -36,7 +42,8 @@ def get_files_info(working_directory, directory="."):
     # =============================
 
     # Check if the path actually exists and is a directory
-    if not os.path.isdir(target_dir):
+    # (the workspace also knows directories created earlier in this session)
+    if not workspace.isdir(target_dir):
         return f'Error: "{directory}" is not a directory'
 
     # STEP 3: DIRECTORY LISTING AND PROCESSING
@@ -46,13 +53,13 @@ def get_files_info(working_directory, directory="."):
         # Get a list of all items (files and directories) in the specified directory
         files_info = []
 
-        # Process each item in the directory
-        for filename in os.listdir(target_dir):
+        # Process each item in the directory, including files written in this session
+        for filename in workspace.listdir(target_dir):
             # Construct the full path to this specific item
             filepath = os.path.join(target_dir, filename)
 
             # Determine if this item is a directory or a file
-            is_dir = os.path.isdir(filepath)
+            is_dir = workspace.isdir(filepath)
 
             # FORMATTING: Create the output line according to the specified format
             # The format must be exactly: "- filename: file_size=X bytes, is_dir=Y"
@@ -64,7 +71,7 @@ def get_files_info(working_directory, directory="."):
             else:
                 # For files, get the actual size in bytes
                 # os.path.getsize() returns the file size in bytes
-                file_size = os.path.getsize(filepath)
+                file_size = workspace.getsize(filepath)
                 line = f"- {filename}: file_size={file_size} bytes, is_dir=False"
 
             # Add this formatted line to our collection
@@ -0,0 +1,86 @@
+import os
+import os.path
+import sys
+
+from google.genai import types
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions.symbol_index import format_outline, symbol_index
+from functions.workspace import workspace
+
+
+def get_file_outline(working_directory, file_path):
+    """
+    Get an outline of the classes and functions defined in a Python file.
+
+    This function is designed to be safe for LLM agents by:
+    1. Preventing access outside the working directory (security)
+    2. Always returning strings (LLM-friendly)
+    3. Handling all errors gracefully
+    4. Returning only signatures and line ranges so the LLM can read just the lines it needs
+
+    Args:
+        working_directory (str): The base directory that acts as a security boundary
+        file_path (str): The path to the Python file to outline within the working directory
+
+    Returns:
+        str: Either the outline of the file or an error message
+    """
+
+    # STEP 1: PATH CONSTRUCTION AND VALIDATION
+    # ==========================================
+
+    abs_working_dir = os.path.abspath(working_directory)
+    target_file = os.path.abspath(os.path.join(working_directory, file_path))
+
+    # SECURITY CHECK: Ensure the requested path stays within working directory boundaries
+    if not target_file.startswith(abs_working_dir):
+        return f'Error: Cannot outline "{file_path}" as it is outside the permitted working directory'
+
+    # STEP 2: FILE VALIDATION
+    # =========================
+
+    if not workspace.isfile(target_file):
+        return f'Error: "{file_path}" is not a file'
+
+    if not target_file.endswith(".py"):
+        return f'Error: "{file_path}" is not a Python file.'
+
+    # STEP 3: BUILD OUTLINE FROM THE SYMBOL INDEX
+    # ============================================
+
+    try:
+        # The index only re-parses the file when its mtime or size changed, or when
+        # the session has written new content for it that is not on disk yet
+        symbols = symbol_index.get_symbols(
+            target_file, source=workspace.overlay_text(target_file)
+        )
+    except SyntaxError as e:
+        return f'Error: Cannot outline "{file_path}": syntax error on line {e.lineno}: {e.msg}'
+    except UnicodeDecodeError:
+        return "Error: Cannot read file as text - it may be a binary file or have unsupported encoding"
+    except OSError as e:
+        return f"Error: {e}"
+
+    if not symbols:
+        return f'No classes or functions defined in "{file_path}".'
+
+    return "\n".join([f"Outline of {file_path}:"] + format_outline(symbols))
+
+
+schema_get_file_outline = types.FunctionDeclaration(
+    name="get_file_outline",
+    description="Lists the classes and functions in a Python file within the working directory, with signatures, docstring first lines and line ranges. Use it before get_file_content to find the part of a file you need.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "file_path": types.Schema(
+                type=types.Type.STRING,
+                description="The path to the Python file to outline.",
+            ),
+        },
+        required=["file_path"],
+    ),
+)
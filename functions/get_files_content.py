@@ -0,0 +1,189 @@
+import contextvars
+import os
+import os.path
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+
+from google.genai import types
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MAX_BATCH_CHARACTERS, MAX_BATCH_FILES, MAX_CHARACTERS, READ_WORKERS
+from functions.workspace import workspace
+
+SKIPPED_DIRS = {"__pycache__"}
+
+
+def get_files_content(working_directory, file_paths=None, pattern=None):
+    """
+    Get the content of several files within a specified working directory in one call.
+
+    This function is designed to be safe for LLM agents by:
+    1. Preventing access outside the working directory for every path (security)
+    2. Always returning strings (LLM-friendly)
+    3. Handling all errors gracefully, per file
+    4. Keeping the combined output under MAX_BATCH_CHARACTERS, truncating per file
+
+    Args:
+        working_directory (str): The base directory that acts as a security boundary
+        file_paths (list): Paths of the files to read within the working directory
+        pattern (str): Optional glob, e.g. "pkg/*.py" or "**/*.py", matched against
+            paths relative to the working directory; "**" spans directories
+
+    Returns:
+        str: Each file's content under a "===== path =====" header, or an error message
+    """
+
+    # STEP 1: COLLECT THE REQUESTED PATHS
+    # ====================================
+
+    abs_working_dir = os.path.abspath(working_directory)
+    if not file_paths and not pattern:
+        return "Error: Give file_paths or a pattern"
+
+    requested = list(file_paths or [])
+    if pattern:
+        if os.path.isabs(pattern) or ".." in pattern.split("/"):
+            return f'Error: Cannot match "{pattern}" as it is outside the permitted working directory'
+        matches = _glob(abs_working_dir, pattern)
+        if not matches and not requested:
+            return f'Error: No files match "{pattern}"'
+        requested.extend(m for m in matches if m not in requested)
+
+    omitted = requested[MAX_BATCH_FILES:]
+    requested = requested[:MAX_BATCH_FILES]
+
+    # STEP 2: READ ALL FILES CONCURRENTLY
+    # ===================================
+
+    with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(requested))) as pool:
+        # Each read runs in a copy of this context so it sees the current agent session
+        futures = [
+            pool.submit(contextvars.copy_context().run, _read, abs_working_dir, path)
+            for path in requested
+        ]
+        results = [future.result() for future in futures]
+
+    # STEP 3: FIT THE CONTENTS INTO THE BUDGET
+    # ========================================
+
+    limits = _share_budget(
+        [len(content) for content, error in results if error is None],
+        MAX_BATCH_CHARACTERS,
+    )
+    sections = []
+    for path, (content, error) in zip(requested, results):
+        if error is not None:
+            sections.append(f"===== {path} =====\n{error}")
+            continue
+        limit = limits.pop(0)
+        if len(content) > limit:
+            content = content[:limit] + (
+                f'\n\n[File "{path}" truncated at {limit} of {len(content)} characters;'
+                " use get_file_content with start_line/end_line for the rest]"
+            )
+        sections.append(f"===== {path} =====\n{content}")
+
+    if omitted:
+        sections.append(
+            f"[{len(omitted)} more files not read, the limit is {MAX_BATCH_FILES} per call: "
+            + ", ".join(omitted)
+            + "]"
+        )
+    return "\n\n".join(sections)
+
+
+def _read(abs_working_dir, file_path):
+    """Read one file. Returns (content, None) or (None, error message)."""
+    target_file = os.path.abspath(os.path.join(abs_working_dir, file_path))
+
+    # SECURITY CHECK: Ensure the requested path stays within working directory boundaries
+    if not target_file.startswith(abs_working_dir):
+        return None, f'Error: Cannot read "{file_path}" as it is outside the permitted working directory'
+    if not workspace.isfile(target_file):
+        return None, f'Error: "{file_path}" is not a file'
+
+    try:
+        return workspace.read_text(target_file), None
+    except UnicodeDecodeError:
+        return None, "Error: Cannot read file as text - it may be a binary file or have unsupported encoding"
+    except OSError as e:
+        return None, f"Error: {e}"
+
+
+def _share_budget(sizes, budget):
+    """
+    Split budget between files of the given sizes, capped at MAX_CHARACTERS each.
+
+    Files smaller than an equal share keep all of their content and the
+    rest of their share goes to the larger files.
+    """
+    limits = [0] * len(sizes)
+    pending = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    while pending:
+        share = budget // len(pending)
+        i = pending.pop(0)
+        limits[i] = min(sizes[i], share, MAX_CHARACTERS)
+        budget -= limits[i]
+    return limits
+
+
+def _glob(abs_working_dir, pattern):
+    """Return the files matching pattern, relative to abs_working_dir, including pending writes."""
+    parts = [part for part in pattern.split("/") if part not in ("", ".")]
+    matches = []
+
+    def walk(directory, relative, parts):
+        if not parts:
+            return
+        part, rest = parts[0], parts[1:]
+        if part == "**":
+            # Zero directories, then one more level with ** still in effect
+            walk(directory, relative, rest)
+        for name in workspace.listdir(directory):
+            if name in SKIPPED_DIRS or (name.startswith(".") and not part.startswith(".")):
+                continue
+            path = os.path.join(directory, name)
+            is_dir = workspace.isdir(path)
+            if part == "**":
+                if is_dir:
+                    walk(path, f"{relative}{name}/", parts)
+                elif not rest:
+                    # A trailing ** matches every file below this directory
+                    matches.append(f"{relative}{name}")
+                continue
+            if not fnmatchcase(name, part):
+                continue
+            if rest:
+                if is_dir:
+                    walk(path, f"{relative}{name}/", rest)
+            elif not is_dir:
+                matches.append(f"{relative}{name}")
+
+    walk(abs_working_dir, "", parts)
+    return sorted(set(matches))
+
+
+schema_get_files_content = types.FunctionDeclaration(
+    name="get_files_content",
+    description=(
+        "Reads several files within the working directory in one call, given a list of "
+        "paths and/or a glob pattern. Long files are truncated to fit an overall size budget."
+    ),
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "file_paths": types.Schema(
+                type=types.Type.ARRAY,
+                items=types.Schema(type=types.Type.STRING),
+                description="The paths of the files to read.",
+            ),
+            "pattern": types.Schema(
+                type=types.Type.STRING,
+                description='Optional glob relative to the working directory, e.g. "pkg/*.py" or "**/*.py".',
+            ),
+        },
+    ),
+)
@@ -0,0 +1,136 @@
+import os
+import sys
+import threading
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions.workspace import workspace
+
+SKIPPED_DIRS = {"__pycache__"}
+
+
+class PathIndex:
+    """
+    Name-to-path index of each working directory, for resolving bare or
+    partial paths such as "calculator.py" or "pkg/render.py".
+
+    A working directory is walked once, on its first lookup. After that the
+    index is kept current by add() (called for every file a tool writes) and,
+    when a lookup finds nothing, by re-listing only the directories whose
+    mtime changed since they were last listed. Lookups go through a dict
+    keyed by the last path component, so they cost the same however large
+    the tree is.
+    """
+
+    def __init__(self):
+        self._roots = {}  # abs working dir -> _Tree
+        self._lock = threading.Lock()
+
+    def resolve(self, working_directory, path, kind="file"):
+        """
+        Find the paths a possibly partial path refers to.
+
+        Args:
+            working_directory (str): The directory paths are relative to
+            path (str): A path relative to working_directory, or a trailing
+                part of one, e.g. "render.py" for "pkg/render.py"
+            kind (str): "file" or "dir"
+
+        Returns:
+            list: The matching relative paths, sorted. [path] itself when it
+            already exists, [] when nothing matches, several when it is ambiguous
+        """
+        abs_working_dir = os.path.abspath(working_directory)
+        relative = os.path.normpath(path).replace(os.sep, "/")
+        exists = workspace.isdir if kind == "dir" else workspace.isfile
+        if relative in (".", "") or exists(os.path.join(abs_working_dir, relative)):
+            return [path]
+        if relative.startswith("../") or os.path.isabs(path):
+            # Never resolve a path into the working directory that points outside it
+            return []
+
+        with self._lock:
+            tree = self._roots.get(abs_working_dir)
+            if tree is None:
+                tree = self._roots[abs_working_dir] = _Tree(abs_working_dir)
+            matches = tree.lookup(relative, kind)
+            if not matches and tree.refresh():
+                matches = tree.lookup(relative, kind)
+        return matches
+
+    def add(self, path):
+        """Record a file that was just written, in every indexed working directory containing it."""
+        abs_path = os.path.abspath(path)
+        with self._lock:
+            for root, tree in self._roots.items():
+                if abs_path.startswith(root + os.sep):
+                    tree.add(os.path.relpath(abs_path, root).replace(os.sep, "/"), "file")
+
+
+class _Tree:
+    def __init__(self, root):
+        self.root = root
+        self.by_name = {}  # last path component -> {relative path: kind}
+        self.listed = {}  # relative dir ("" for root) -> mtime_ns when it was listed
+        self._list("")
+
+    def lookup(self, relative, kind):
+        name = relative.rsplit("/", 1)[-1]
+        suffix = "/" + relative
+        exists = workspace.isdir if kind == "dir" else workspace.isfile
+        matches = []
+        for candidate, candidate_kind in list(self.by_name.get(name, {}).items()):
+            if candidate_kind != kind or not ("/" + candidate).endswith(suffix):
+                continue
+            if exists(os.path.join(self.root, candidate)):
+                matches.append(candidate)
+            else:
+                # Deleted, or a pending write that was aborted
+                del self.by_name[name][candidate]
+        return sorted(matches)
+
+    def add(self, relative, kind):
+        parts = relative.split("/")
+        # Parent directories may be new too, e.g. after writing "docs/notes.txt"
+        for i in range(1, len(parts)):
+            self.by_name.setdefault(parts[i - 1], {})["/".join(parts[:i])] = "dir"
+        self.by_name.setdefault(parts[-1], {})[relative] = kind
+
+    def refresh(self):
+        """Re-list directories changed on disk since they were listed. Returns True if any were."""
+        changed = False
+        for directory, mtime in list(self.listed.items()):
+            current = _mtime(os.path.join(self.root, directory))
+            if current != mtime:
+                changed = True
+                if current is None:
+                    del self.listed[directory]
+                else:
+                    self._list(directory)
+        return changed
+
+    def _list(self, directory):
+        path = os.path.join(self.root, directory)
+        self.listed[directory] = _mtime(path)
+        for name in workspace.listdir(path):
+            if name.startswith(".") or name in SKIPPED_DIRS:
+                continue
+            relative = f"{directory}/{name}" if directory else name
+            if workspace.isdir(os.path.join(path, name)):
+                self.add(relative, "dir")
+                if relative not in self.listed:
+                    self._list(relative)
+            else:
+                self.add(relative, "file")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# Shared so every tool call benefits from the walk done by the first one
+path_index = PathIndex()
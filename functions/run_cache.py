@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import RUN_CACHE_MAX_ENTRIES, RUN_CACHE_WAIT_SLICE
+from session import SessionCancelled, current_session
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RunCache:
+    """
+    Singleflight and memo layer for run_python_file.
+
+    Runs are keyed by a hash of the script, every Python source importable
+    from the working directory, the arguments and the interpreter. While a
+    run is in flight, identical requests wait for its result instead of
+    starting their own process. Finished results are reused until one of
+    the inputs changes, which changes the key.
+    """
+
+    def __init__(self, max_entries=RUN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._inflight = {}
+        self._file_digests = {}
+        self._lock = threading.Lock()
+
+    def key(self, working_directory, target_file, args, interpreter="python"):
+        """Build the cache key for running target_file with args from working_directory."""
+        abs_working_dir = os.path.abspath(working_directory)
+        sources = [(os.path.relpath(target_file, abs_working_dir), self._digest(target_file))]
+        for root, dirs, files in os.walk(abs_working_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d != "__pycache__")
+            for filename in sorted(files):
+                if filename.endswith(".py"):
+                    path = os.path.join(root, filename)
+                    sources.append((os.path.relpath(path, abs_working_dir), self._digest(path)))
+
+        executable = shutil.which(interpreter) or interpreter
+        payload = json.dumps(
+            {
+                "sources": sources,
+                "args": list(args or []),
+                "interpreter": os.path.realpath(executable),
+                "cwd": abs_working_dir,
+            }
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_or_run(self, key, run):
+        """
+        Return the memoized result for key, or compute it with run().
+
+        A caller waiting for an identical run stops waiting when its own
+        session is cancelled or out of time. If the run it waited for was
+        cancelled by the other session, it starts the run itself.
+
+        Returns:
+            tuple: (result, reused) where reused is True if no new run was started
+
+        Raises:
+            Exception: Whatever run() raised; failed runs are not memoized
+            SessionCancelled: If the caller's session ended while waiting
+        """
+        session = current_session()
+        while True:
+            with self._lock:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    return self._memo[key], True
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _Flight()
+            if leader:
+                break
+
+            # An identical run is already in progress; share its outcome
+            self._wait(flight, session)
+            if isinstance(flight.error, SessionCancelled):
+                # Only the other session ended, not the run: try again, possibly as leader
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = run()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if flight.error is None:
+                    self._memo[key] = flight.result
+                    while len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+            flight.done.set()
+        return flight.result, False
+
+    def _wait(self, flight, session):
+        # Wake up regularly, and at the deadline, to notice the session ending
+        if session is None:
+            flight.done.wait()
+            return
+        while True:
+            session.check()
+            remaining = session.remaining()
+            wait = RUN_CACHE_WAIT_SLICE if remaining is None else min(RUN_CACHE_WAIT_SLICE, remaining)
+            if flight.done.wait(wait):
+                return
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self._file_digests.clear()
+
+    def _digest(self, path):
+        # Content hashes are cached by stat data so unchanged files are not re-read
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._file_digests.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        # Read outside the lock; two sessions hashing the same file store the same result
+        with open(path, "rb") as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        with self._lock:
+            self._file_digests[path] = (stamp, digest)
+        return digest
+
+
+# Shared across sessions so concurrent and repeated runs can be deduplicated
+run_cache = RunCache()
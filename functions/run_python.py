@@ -4,6 +4,14 @@ import os
 import os.path
 from google.genai import types
 
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EXEC_QUEUE_REPORT_SECONDS, EXEC_TIMEOUT, RUN_DEDUP
+from functions.run_cache import run_cache
+from functions.scheduler import scheduler
+from functions.workspace import workspace
+
 
 def run_python_file(working_directory, file_path, args=[]):
     """
@@ -33,7 +41,7 @@ def run_python_file(working_directory, file_path, args=[]):
     # =========================
 
     # Check if the path actually exists and is a file
-    if not os.path.isfile(target_file):
+    if not workspace.isfile(target_file):
         return f'Error: File "{file_path}" not found.'
 
     if not target_file.endswith(".py"):
@@ -43,15 +51,26 @@ def run_python_file(working_directory, file_path, args=[]):
     # ========================
 
     try:
+        # The child process reads from disk, so put pending session writes there first
+        workspace.materialize()
+
         # Prepare command with arguments
         cmd = ["python", target_file]
         if args:
             cmd.extend(args)
 
-        # Use subprocess.run to run the Python file
-        result = subprocess.run(
-            cmd, capture_output=True, timeout=30, cwd=working_directory, text=True
-        )
+        # Run through the shared scheduler, which caps concurrent executions,
+        # applies resource limits and kills the whole process tree on timeout
+        def execute():
+            return scheduler.run(cmd, cwd=working_directory, timeout=EXEC_TIMEOUT)
+
+        # With RUN_DEDUP, identical runs on unchanged sources share one process
+        reused = False
+        if RUN_DEDUP:
+            key = run_cache.key(working_directory, target_file, args)
+            result, reused = run_cache.get_or_run(key, execute)
+        else:
+            result = execute()
 
         # Format output according to assignment requirements
         output_parts = []
@@ -68,6 +87,14 @@ def run_python_file(working_directory, file_path, args=[]):
         if result.returncode != 0:
             output_parts.append(f"Process exited with code {result.returncode}")
 
+        # Report time spent waiting for an execution slot when the host was busy
+        if reused:
+            output_parts.append("Result reused from an identical run on unchanged sources")
+        elif result.queue_time >= EXEC_QUEUE_REPORT_SECONDS:
+            output_parts.append(
+                f"Queued for {result.queue_time:.2f} seconds waiting for an execution slot"
+            )
+
         # If no output was produced, return the specified message
         if not output_parts:
             return "No output produced."
@@ -75,8 +102,8 @@ def run_python_file(working_directory, file_path, args=[]):
         # Join all output parts with newlines
         return "\n".join(output_parts)
 
-    except subprocess.TimeoutExpired:
-        return f"Error: executing Python file: timeout after 30 seconds"
+    except subprocess.TimeoutExpired as e:
+        return f"Error: executing Python file: timeout after {e.timeout:g} seconds"
     except Exception as e:
         return f"Error: executing Python file: {e}"
 
@@ -0,0 +1,277 @@
+import ast
+import contextvars
+import json
+import os
+import os.path
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from google.genai import types
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EXEC_TIMEOUT, TEST_WORKERS
+from functions.scheduler import scheduler
+from functions.unittest_worker import RESULT_MARKER
+from functions.workspace import workspace
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "unittest_worker.py")
+TEST_FILE_PREFIX = "test"
+TRACEBACK_LINES = 12
+
+
+def run_tests(working_directory, test_ids=None, changed_files=None, workers=None):
+    """
+    Discover and run unittest tests within a specified working directory.
+
+    This function is designed to be safe for LLM agents by:
+    1. Preventing access outside the working directory (security)
+    2. Always returning strings (LLM-friendly)
+    3. Handling all errors gracefully
+    4. Returning a compact JSON summary that only details failing tests
+
+    Args:
+        working_directory (str): The base directory that acts as a security boundary
+        test_ids (list[str]): Optional test ids to run, e.g. "tests.TestCalculator.test_addition".
+            A module or class id selects every test inside it.
+        changed_files (list[str]): Optional changed file paths; only tests that import them
+            (directly or indirectly) are run
+        workers (int): Number of worker processes to shard the tests across
+
+    Returns:
+        str: Either a JSON summary of the test run or an error message
+    """
+
+    # STEP 1: PATH VALIDATION
+    # =======================
+
+    abs_working_dir = os.path.abspath(working_directory)
+    if not os.path.isdir(abs_working_dir):
+        return f'Error: "{working_directory}" is not a directory'
+
+    for changed in changed_files or []:
+        target = os.path.abspath(os.path.join(working_directory, changed))
+        if not target.startswith(abs_working_dir):
+            return f'Error: Cannot use "{changed}" as it is outside the permitted working directory'
+
+    # STEP 2: DISCOVER AND SELECT TESTS
+    # ==================================
+
+    try:
+        # Discovery and the worker processes read from disk, so flush pending writes first
+        workspace.materialize()
+        modules = _scan_modules(abs_working_dir)
+    except OSError as e:
+        return f"Error: {e}"
+
+    tests = _discover_tests(modules)
+    if not tests:
+        return "No unittest tests found."
+
+    if test_ids:
+        tests = [t for t in tests if any(_id_matches(t[1], wanted) for wanted in test_ids)]
+    if changed_files:
+        affected = _affected_modules(modules, abs_working_dir, changed_files)
+        tests = [t for t in tests if t[0] in affected]
+    if not tests:
+        return "No tests matched the given filters."
+
+    # STEP 3: RUN SHARDS IN PARALLEL
+    # ==============================
+
+    shards = _shard(tests, workers or TEST_WORKERS)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        # Each shard runs in a copy of this context so it sees the current agent session
+        futures = [
+            pool.submit(contextvars.copy_context().run, _run_shard, abs_working_dir, ids)
+            for ids in shards
+        ]
+        results = [future.result() for future in futures]
+
+    # STEP 4: SUMMARIZE
+    # =================
+
+    problems = [p for r in results for p in r["problems"]]
+    failed = sum(r["failures"] for r in results)
+    errors = sum(r["errors"] for r in results)
+    skipped = sum(r["skipped"] for r in results)
+    ran = sum(r["ran"] for r in results)
+    summary = {
+        "status": "passed" if not problems else "failed",
+        "ran": ran,
+        "passed": ran - failed - errors - skipped,
+        "failed": failed,
+        "errors": errors,
+        "skipped": skipped,
+        "workers": len(shards),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    if problems:
+        summary["failures"] = [
+            {
+                "test": p["test"],
+                "type": p["type"],
+                "message": p["message"],
+                "traceback": "\n".join(p["traceback"].splitlines()[-TRACEBACK_LINES:]),
+            }
+            for p in problems
+        ]
+    return json.dumps(summary, indent=2)
+
+
+def _scan_modules(abs_working_dir):
+    """Map dotted module names to parsed ASTs for every Python file in the tree."""
+    modules = {}
+    for root, dirs, files in os.walk(abs_working_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for filename in files:
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(root, filename)
+            rel = os.path.relpath(path, abs_working_dir)[:-3]
+            name = rel.replace(os.sep, ".")
+            if name.endswith(".__init__"):
+                name = name[: -len(".__init__")]
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    tree = ast.parse(file.read(), filename=path)
+            except (SyntaxError, UnicodeDecodeError):
+                tree = None
+            modules[name] = (path, tree)
+    return modules
+
+
+def _discover_tests(modules):
+    """Statically find TestCase methods, returning (module, test_id, class_id) tuples."""
+    tests = []
+    for name, (path, tree) in sorted(modules.items()):
+        if tree is None or not os.path.basename(path).startswith(TEST_FILE_PREFIX):
+            continue
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            if not any(ast.unparse(base).endswith("TestCase") for base in node.bases):
+                continue
+            class_id = f"{name}.{node.name}"
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test"):
+                    tests.append((name, f"{class_id}.{item.name}", class_id))
+    return tests
+
+
+def _id_matches(test_id, wanted):
+    return test_id == wanted or test_id.startswith(wanted + ".") or test_id.endswith("." + wanted)
+
+
+def _imports(name, tree, modules):
+    """Return the local modules imported by a module."""
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            candidates = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                package = name.split(".")[: -node.level]
+                base = ".".join(package + ([base] if base else []))
+            candidates = [base] + [f"{base}.{alias.name}" if base else alias.name for alias in node.names]
+        else:
+            continue
+        for candidate in candidates:
+            # "import pkg.calculator" also imports the "pkg" package itself
+            parts = candidate.split(".")
+            for i in range(1, len(parts) + 1):
+                prefix = ".".join(parts[:i])
+                if prefix in modules:
+                    found.add(prefix)
+    return found
+
+
+def _affected_modules(modules, abs_working_dir, changed_files):
+    """Return the modules that are changed or transitively import a changed module."""
+    changed_paths = {os.path.abspath(os.path.join(abs_working_dir, f)) for f in changed_files}
+    affected = {name for name, (path, _) in modules.items() if path in changed_paths}
+
+    # Walk the reverse import graph outwards from the changed modules
+    importers = {}
+    for name, (_, tree) in modules.items():
+        if tree is None:
+            continue
+        for imported in _imports(name, tree, modules):
+            importers.setdefault(imported, set()).add(name)
+
+    pending = list(affected)
+    while pending:
+        for importer in importers.get(pending.pop(), ()):
+            if importer not in affected:
+                affected.add(importer)
+                pending.append(importer)
+    return affected
+
+
+def _shard(tests, workers):
+    """Split tests into at most `workers` shards, keeping each TestCase class together."""
+    classes = {}
+    for _, test_id, class_id in tests:
+        classes.setdefault(class_id, []).append(test_id)
+
+    shards = [[] for _ in range(max(1, min(int(workers), len(classes))))]
+    # Largest classes first, each onto the currently smallest shard
+    for ids in sorted(classes.values(), key=len, reverse=True):
+        min(shards, key=len).extend(ids)
+    return shards
+
+
+def _run_shard(abs_working_dir, test_ids):
+    try:
+        # Shards share the execution slots with run_python_file
+        result = scheduler.run(
+            [sys.executable, WORKER_SCRIPT, *test_ids],
+            cwd=abs_working_dir,
+            timeout=EXEC_TIMEOUT,
+        )
+        for line in reversed(result.stdout.splitlines()):
+            if line.startswith(RESULT_MARKER):
+                return json.loads(line[len(RESULT_MARKER) :])
+        message = (result.stderr.strip().splitlines() or ["worker produced no result"])[-1]
+    except subprocess.TimeoutExpired as e:
+        message = f"timeout after {e.timeout:g} seconds"
+    except Exception as e:
+        message = str(e)
+
+    # The worker itself failed, so report every test in the shard as an error
+    return {
+        "ran": len(test_ids),
+        "failures": 0,
+        "errors": len(test_ids),
+        "skipped": 0,
+        "problems": [
+            {"test": test_id, "type": "error", "message": message, "traceback": ""}
+            for test_id in test_ids
+        ],
+    }
+
+
+schema_run_tests = types.FunctionDeclaration(
+    name="run_tests",
+    description="Discovers and runs the unittest tests within the working directory in parallel worker processes, returning a JSON summary that details only the failing tests. Prefer this over run_python_file for running tests.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "test_ids": types.Schema(
+                type=types.Type.ARRAY,
+                description='Optional test ids to run, e.g. "tests.TestCalculator.test_addition". A module or class id runs every test inside it.',
+                items=types.Schema(type=types.Type.STRING),
+            ),
+            "changed_files": types.Schema(
+                type=types.Type.ARRAY,
+                description="Optional paths of changed files; only tests affected by them are run.",
+                items=types.Schema(type=types.Type.STRING),
+            ),
+        },
+    ),
+)
@@ -0,0 +1,197 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import EXEC_CPU_SECONDS, EXEC_MEMORY_BYTES, EXEC_SLOTS, EXEC_TIMEOUT
+from session import SessionCancelled, current_session
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+@dataclass
+class ExecutionResult:
+    """Output of a finished child process plus how long it waited for a slot."""
+
+    stdout: str
+    stderr: str
+    returncode: int
+    queue_time: float
+
+
+class ExecutionScheduler:
+    """
+    Process-wide admission control for child processes started by the tools.
+
+    At most `slots` children run at once. Further requests wait in a FIFO
+    queue, so a burst of runs from concurrent sessions cannot starve the
+    host and is served in arrival order.
+    """
+
+    def __init__(self, slots=EXEC_SLOTS):
+        self.slots = max(1, int(slots))
+        self._active = 0
+        self._waiting = deque()
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, session=None):
+        """
+        Wait for a free slot in FIFO order and hold it; yields the seconds spent queued.
+
+        With a session, waiting stops as soon as the session is cancelled or
+        its deadline passes, raising SessionCancelled.
+        """
+        ticket = object()
+        queued_at = time.monotonic()
+        unregister = session.token.on_cancel(self._wake) if session else None
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while not (self._waiting[0] is ticket and self._active < self.slots):
+                    if session is not None:
+                        session.check()
+                    self._cond.wait(timeout=session.remaining() if session else None)
+            except BaseException:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+                raise
+            finally:
+                if unregister:
+                    unregister()
+            self._waiting.popleft()
+            self._active += 1
+            # The next ticket in line may also fit if more than one slot is free
+            self._cond.notify_all()
+        try:
+            yield time.monotonic() - queued_at
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def stats(self):
+        """Return the number of running and queued executions."""
+        with self._cond:
+            return {"running": self._active, "queued": len(self._waiting)}
+
+    def run(
+        self,
+        cmd,
+        cwd,
+        timeout=EXEC_TIMEOUT,
+        cpu_seconds=EXEC_CPU_SECONDS,
+        memory_bytes=EXEC_MEMORY_BYTES,
+    ):
+        """
+        Run a command once a slot is free, with resource limits applied to the child.
+
+        The child is started in its own process group, so on timeout the whole
+        tree it spawned is killed, not just the direct child. Inside an agent
+        session the timeout is also capped by the session's remaining budget,
+        and cancelling the session kills the tree immediately.
+
+        Returns:
+            ExecutionResult: The captured output, exit code and queue time
+
+        Raises:
+            subprocess.TimeoutExpired: If the command ran longer than its timeout
+            SessionCancelled: If the session was cancelled or ran out of time
+        """
+        session = current_session()
+        with self.slot(session) as queue_time:
+            if session is not None:
+                timeout = session.timeout(timeout)
+            # preexec_fn is unsafe in a threaded process, so a small wrapper sets
+            # the limits on itself and then execs the command, before any of its code runs
+            limits = _limits(cpu_seconds, memory_bytes)
+            if limits:
+                cmd = _with_limits(cmd, limits)
+            process = subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                start_new_session=True,
+            )
+            unregister = (
+                session.token.on_cancel(lambda: kill_process_tree(process))
+                if session
+                else None
+            )
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_tree(process)
+                process.communicate()
+                if session is not None:
+                    session.check()
+                raise
+            except BaseException:
+                kill_process_tree(process)
+                process.wait()
+                raise
+            finally:
+                if unregister:
+                    unregister()
+        if session is not None and session.token.cancelled:
+            raise SessionCancelled(session.token.reason)
+        return ExecutionResult(stdout, stderr, process.returncode, queue_time)
+
+
+def kill_process_tree(process):
+    """Kill a child started by ExecutionScheduler.run together with its descendants."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        # Already gone
+        pass
+
+
+def _limits(cpu_seconds, memory_bytes):
+    # [(resource name, limit)] for the child, or [] where limits are unsupported
+    if resource is None:
+        return []
+    limits = []
+    if cpu_seconds is not None:
+        limits.append(("RLIMIT_CPU", cpu_seconds))
+    if memory_bytes is not None:
+        limits.append(("RLIMIT_AS", memory_bytes))
+    return limits
+
+
+# Sets the limits on itself, then execs the real command in the same process
+_LIMIT_WRAPPER = (
+    "import json, os, resource, sys\n"
+    "for name, value in json.loads(sys.argv[1]):\n"
+    "    resource.setrlimit(getattr(resource, name), (value, value))\n"
+    "os.execvp(sys.argv[2], sys.argv[2:])\n"
+)
+
+
+def _with_limits(cmd, limits):
+    return [sys.executable, "-c", _LIMIT_WRAPPER, json.dumps(limits), *cmd]
+
+
+# Shared by every tool that starts child processes
+scheduler = ExecutionScheduler()
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+
+# Add the parent directory to the path so we can import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CACHE_DIR, SNAPSHOT_KEEP
+from functions.workspace import workspace
+
+SKIPPED_DIRS = {"__pycache__"}
+
+
+class SnapshotStore:
+    """
+    Merkle-style snapshots of a working directory.
+
+    A file node holds the hash of the file's content plus the mtime and size
+    it was hashed at; a directory node holds a hash over its children's
+    names and hashes. A new snapshot reuses the hash of every file whose
+    stat data is unchanged since the previous snapshot of the same
+    directory, so only changed files are read. Comparing two snapshots
+    skips every subtree whose hash is equal.
+
+    Snapshots are saved under CACHE_DIR, so IDs stay valid across sessions.
+    The snapshot ID is a prefix of the root hash. A snapshot that includes
+    writes still pending in the caller's workspace transaction is saved
+    too, but it does not become the directory's latest snapshot: the
+    transaction may still abort, and other sessions do not see its writes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, keep=SNAPSHOT_KEEP):
+        self.directory = os.path.join(cache_dir, "snapshots")
+        self.keep = keep
+        self._latest = {}  # abs working dir -> tree of its newest snapshot
+        self._lock = threading.Lock()
+
+    def take(self, working_directory):
+        """Snapshot working_directory (including pending workspace writes) and return its ID."""
+        return self._take(os.path.abspath(working_directory))[0]
+
+    def _take(self, abs_working_dir):
+        prefix = abs_working_dir + os.sep
+        pending = any(path.startswith(prefix) for path in workspace.pending_files())
+        with self._lock:
+            previous = self._latest.get(abs_working_dir)
+            if previous is None:
+                previous = self._load_latest(abs_working_dir)
+            tree = _build(abs_working_dir, previous)
+            snapshot_id = tree["h"][:16]
+            if not pending:
+                self._latest[abs_working_dir] = tree
+            self._save(snapshot_id, abs_working_dir, tree, latest=not pending)
+        return snapshot_id, tree
+
+    def latest_id(self, working_directory):
+        """Return the ID of the newest saved snapshot of working_directory, or None."""
+        index = self._read_json(os.path.join(self.directory, "latest.json")) or {}
+        return index.get(os.path.abspath(working_directory))
+
+    def load(self, snapshot_id):
+        """Return the tree saved under snapshot_id, or None if it is unknown."""
+        if not all(c in "0123456789abcdef" for c in snapshot_id):
+            return None
+        data = self._read_json(os.path.join(self.directory, f"{snapshot_id}.json"))
+        return data["tree"] if data else None
+
+    def changes(self, working_directory, since):
+        """
+        Snapshot working_directory and compare it with snapshot `since`.
+
+        Returns:
+            tuple: (new snapshot ID, {"added": [...], "removed": [...], "modified": [...]})
+
+        Raises:
+            KeyError: If `since` is not a known snapshot ID
+        """
+        old = self.load(since)
+        if old is None:
+            raise KeyError(since)
+        snapshot_id, new = self._take(os.path.abspath(working_directory))
+        result = {"added": [], "removed": [], "modified": []}
+        _diff(old, new, "", result)
+        return snapshot_id, result
+
+    def _save(self, snapshot_id, abs_working_dir, tree, latest=True):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{snapshot_id}.json")
+        if not os.path.exists(path):
+            _write_json(path, {"working_directory": abs_working_dir, "tree": tree})
+        if latest:
+            index_path = os.path.join(self.directory, "latest.json")
+            index = self._read_json(index_path) or {}
+            index[abs_working_dir] = snapshot_id
+            _write_json(index_path, index)
+        self._prune()
+
+    def _load_latest(self, abs_working_dir):
+        snapshot_id = self.latest_id(abs_working_dir)
+        return self.load(snapshot_id) if snapshot_id else None
+
+    def _prune(self):
+        # Keep the most recently written snapshots, but never one that is someone's latest
+        index = self._read_json(os.path.join(self.directory, "latest.json")) or {}
+        latest = {f"{snapshot_id}.json" for snapshot_id in index.values()}
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json") and name != "latest.json" and name not in latest
+        ]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[max(0, self.keep - len(latest)) :]:
+            os.remove(path)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+
+def _build(path, previous):
+    """Build the tree for directory `path`, reusing file hashes from `previous` where stat matches."""
+    children = {}
+    previous_children = (previous or {}).get("c", {})
+    for name in workspace.listdir(path):
+        if name.startswith(".") or name in SKIPPED_DIRS:
+            continue
+        child_path = os.path.join(path, name)
+        old = previous_children.get(name)
+        if workspace.isdir(child_path):
+            children[name] = _build(child_path, old if old and "c" in old else None)
+            continue
+
+        pending = workspace.overlay_text(child_path)
+        if pending is not None:
+            # Written in this session but not on disk yet: hash the pending content
+            children[name] = {"h": hashlib.sha256(pending.encode("utf-8")).hexdigest()}
+            continue
+        try:
+            stat = os.stat(child_path)
+        except FileNotFoundError:
+            continue
+        if old and old.get("m") == stat.st_mtime_ns and old.get("s") == stat.st_size:
+            children[name] = old
+            continue
+        digest = hashlib.sha256()
+        with open(child_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 16), b""):
+                digest.update(chunk)
+        children[name] = {"h": digest.hexdigest(), "m": stat.st_mtime_ns, "s": stat.st_size}
+
+    digest = hashlib.sha256()
+    for name in sorted(children):
+        kind = "d" if "c" in children[name] else "f"
+        digest.update(f"{kind}\0{name}\0{children[name]['h']}\n".encode("utf-8"))
+    return {"h": digest.hexdigest(), "c": children}
+
+
+def _diff(old, new, prefix, result):
+    if old["h"] == new["h"]:
+        return
+    old_children, new_children = old.get("c", {}), new.get("c", {})
+    for name in sorted(set(old_children) | set(new_children)):
+        path = f"{prefix}{name}"
+        before, after = old_children.get(name), new_children.get(name)
+        if before is None:
+            result["added"].extend(_files(after, path))
+        elif after is None:
+            result["removed"].extend(_files(before, path))
+        elif ("c" in before) != ("c" in after):
+            # A file became a directory or the other way round
+            result["removed"].extend(_files(before, path))
+            result["added"].extend(_files(after, path))
+        elif "c" in after:
+            _diff(before, after, f"{path}/", result)
+        elif before["h"] != after["h"]:
+            result["modified"].append(path)
+
+
+def _files(node, path):
+    if "c" not in node:
+        return [path]
+    return [f for name in sorted(node["c"]) for f in _files(node["c"][name], f"{path}/{name}")]
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+# Shared so snapshots taken by different tool calls build on each other
+snapshot_store = SnapshotStore()
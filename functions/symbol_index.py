@@ -0,0 +1,111 @@
+import ast
+import os
+import threading
+
+
+class SymbolIndex:
+    """
+    Cache of the classes and functions defined in Python files.
+
+    Each file is parsed with ast the first time it is requested. The parsed
+    symbols are kept together with the file's mtime and size, so later
+    requests only re-parse the file when it has changed on disk.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_symbols(self, path, source=None):
+        """
+        Return the symbols defined in a Python file.
+
+        Args:
+            path (str): Path to the Python file
+            source (str): Content to use instead of the file on disk, e.g. an
+                unsaved edit; cached by the content itself rather than mtime
+
+        Returns:
+            list[dict]: Top-level symbols, each with a "children" list of nested symbols
+
+        Raises:
+            OSError: If the file cannot be read
+            SyntaxError: If the file is not valid Python
+        """
+        abs_path = os.path.abspath(path)
+        if source is not None:
+            key = ("source", hash(source))
+        else:
+            stat = os.stat(abs_path)
+            key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(abs_path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        if source is None:
+            with open(abs_path, "r", encoding="utf-8") as file:
+                source = file.read()
+        symbols = parse_symbols(source, filename=abs_path)
+
+        with self._lock:
+            self._entries[abs_path] = (key, symbols)
+        return symbols
+
+
+def parse_symbols(source, filename="<unknown>"):
+    """Parse Python source and return its class and function symbols."""
+    tree = ast.parse(source, filename=filename)
+    return _collect(tree.body)
+
+
+def _collect(body):
+    symbols = []
+    for node in body:
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+            bases = [ast.unparse(base) for base in node.bases]
+            signature = f"({', '.join(bases)})" if bases else ""
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+            signature = f"({ast.unparse(node.args)})"
+            if node.returns is not None:
+                signature += f" -> {ast.unparse(node.returns)}"
+        else:
+            continue
+
+        # Decorators belong to the definition, so the range starts at the first one
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        docstring = ast.get_docstring(node)
+        symbols.append(
+            {
+                "kind": kind,
+                "name": node.name,
+                "signature": signature,
+                "doc": docstring.strip().splitlines()[0] if docstring else "",
+                "start": start,
+                "end": node.end_lineno,
+                "children": _collect(node.body),
+            }
+        )
+    return symbols
+
+
+def format_outline(symbols, depth=0):
+    """Render symbols as an indented, one-line-per-symbol outline."""
+    lines = []
+    for symbol in symbols:
+        line = (
+            f"{'    ' * depth}{symbol['kind']} {symbol['name']}{symbol['signature']}"
+            f"  [lines {symbol['start']}-{symbol['end']}]"
+        )
+        if symbol["doc"]:
+            line += f"  # {symbol['doc']}"
+        lines.append(line)
+        lines.extend(format_outline(symbol["children"], depth + 1))
+    return lines
+
+
+# Shared index so every tool call benefits from files parsed earlier
+symbol_index = SymbolIndex()
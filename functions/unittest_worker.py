@@ -0,0 +1,81 @@
+"""
+Worker process used by run_tests.
+
+Runs the unittest ids given on the command line from the current directory
+and prints a single JSON summary line, prefixed with RESULT_MARKER, so the
+parent process does not have to parse unittest's text output.
+"""
+
+import io
+import json
+import os
+import sys
+import time
+import unittest
+
+RESULT_MARKER = "__RUN_TESTS_RESULT__"
+
+
+class _CollectingResult(unittest.TestResult):
+    def __init__(self):
+        super().__init__()
+        self.problems = []
+
+    def _record(self, kind, test, err):
+        # Same formatting as unittest's own report, with unittest's frames stripped
+        text = self._exc_info_to_string(err, test)
+        lines = text.strip().splitlines()
+        self.problems.append(
+            {
+                "test": test.id(),
+                "type": kind,
+                "message": lines[-1] if lines else "",
+                "traceback": text,
+            }
+        )
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record("failure", test, err)
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record("error", test, err)
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.problems.append(
+            {"test": test.id(), "type": "unexpected success", "message": "", "traceback": ""}
+        )
+
+
+def main(test_ids):
+    # Tests import project modules relative to the directory they run in
+    sys.path.insert(0, os.getcwd())
+
+    started = time.perf_counter()
+    suite = unittest.defaultTestLoader.loadTestsFromNames(test_ids)
+    result = _CollectingResult()
+    result.buffer = True
+
+    # Keep test output out of our stdout so the JSON line stays parseable
+    real_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        suite.run(result)
+    finally:
+        sys.stdout = real_stdout
+
+    summary = {
+        "ran": result.testsRun,
+        "failures": len(result.failures),
+        "errors": len(result.errors),
+        "skipped": len(result.skipped),
+        "problems": result.problems,
+        "duration": time.perf_counter() - started,
+    }
+    print(RESULT_MARKER + " " + json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
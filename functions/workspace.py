@@ -0,0 +1,239 @@
+import contextvars
+import errno
+import os
+import stat
+import tempfile
+import threading
+
+
+class Transaction:
+    """
+    One session's pending writes: an in-memory copy-on-write overlay, plus
+    what it takes to undo the files it has already put on disk.
+    """
+
+    def __init__(self, workspace):
+        self._workspace = workspace
+        self._lock = threading.RLock()
+        self.active = True
+        self.overlay = {}  # abs path -> text content
+        self.dirty = set()  # overlay paths not yet on disk
+        self.backups = {}  # abs path -> original bytes, or None if it did not exist
+        self.created_dirs = []
+
+    def commit(self):
+        """Flush every pending write to disk in one batch and end the transaction."""
+        with self._lock:
+            if not self.active:
+                return
+            self._flush(sorted(self.dirty))
+            self._end()
+
+    def abort(self):
+        """Discard pending writes, restore materialized files and end the transaction."""
+        with self._lock:
+            if not self.active:
+                return
+            for path, original in self.backups.items():
+                if original is None:
+                    if os.path.isfile(path):
+                        os.remove(path)
+                else:
+                    with open(path, "wb") as file:
+                        file.write(original)
+            for directory in reversed(self.created_dirs):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    # Not empty: something else was put there meanwhile
+                    pass
+            self._end()
+
+    def materialize(self):
+        """Write pending overlay files to disk so child processes can see them."""
+        with self._lock:
+            if self.dirty:
+                self._flush(sorted(self.dirty))
+                self.dirty.clear()
+
+    def _end(self):
+        self.active = False
+        self.overlay.clear()
+        self.dirty.clear()
+        self.backups.clear()
+        self.created_dirs.clear()
+        self._workspace._forget(self)
+
+    def _flush(self, paths):
+        # Write every file to a temporary sibling first and only then rename
+        # them all into place, so a failure part-way leaves the originals intact
+        staged = []
+        try:
+            for path in paths:
+                self._make_parent_dirs(path)
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(path), prefix=".", suffix=".tmp"
+                )
+                staged.append((tmp_path, path))
+                with os.fdopen(fd, "w", encoding="utf-8") as file:
+                    file.write(self.overlay[path])
+                os.chmod(tmp_path, _file_mode(path))
+        except BaseException:
+            for tmp_path, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        for tmp_path, path in staged:
+            if path not in self.backups:
+                self.backups[path] = _read_bytes(path)
+            os.replace(tmp_path, path)
+
+    def _make_parent_dirs(self, path):
+        missing = []
+        directory = os.path.dirname(path)
+        while directory and not os.path.isdir(directory):
+            missing.append(directory)
+            directory = os.path.dirname(directory)
+        for directory in reversed(missing):
+            os.mkdir(directory)
+            self.created_dirs.append(directory)
+
+
+class Workspace:
+    """
+    Transactional view of the files the tools read and write.
+
+    Outside a transaction every write goes straight to disk. Inside one
+    (between begin() and the returned Transaction's commit() or abort()), writes are kept in an
+    in-memory copy-on-write overlay and reads are served from it, so a
+    session with many edits does no disk I/O for them until commit.
+    run_python_file calls materialize() to put pending writes on disk
+    before a child process reads them; abort() still rolls those back.
+
+    The transaction belongs to the context that began it, like the
+    current session: concurrent sessions each get their own overlay, and
+    one session's commit or abort never touches another's pending writes.
+    Tool threads see it when they run in a copy of the session's context.
+    """
+
+    def __init__(self):
+        self._current = contextvars.ContextVar(f"workspace_transaction_{id(self)}", default=None)
+
+    @property
+    def active(self):
+        return self._current.get() is not None
+
+    # TRANSACTION CONTROL
+    # ===================
+
+    def begin(self):
+        """Start buffering this context's writes in memory; returns the Transaction."""
+        if self._current.get() is not None:
+            raise RuntimeError("A workspace transaction is already active in this context")
+        transaction = Transaction(self)
+        self._current.set(transaction)
+        return transaction
+
+    def materialize(self):
+        """Write this context's pending overlay files to disk so child processes can see them."""
+        transaction = self._current.get()
+        if transaction is not None:
+            transaction.materialize()
+
+    def pending_files(self):
+        """Return the absolute paths of files written in this context's transaction."""
+        transaction = self._current.get()
+        if transaction is None:
+            return []
+        with transaction._lock:
+            return sorted(transaction.overlay)
+
+    # FILE ACCESS USED BY THE TOOLS
+    # =============================
+
+    def read_text(self, path):
+        pending = self.overlay_text(path)
+        if pending is not None:
+            return pending
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    def overlay_text(self, path):
+        """Return the buffered content of path, or None if it is only on disk."""
+        transaction = self._current.get()
+        if transaction is None:
+            return None
+        with transaction._lock:
+            return transaction.overlay.get(path)
+
+    def write_text(self, path, content):
+        if os.path.isdir(path):
+            # Fail now rather than at commit, as a direct write would
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        transaction = self._current.get()
+        if transaction is not None:
+            with transaction._lock:
+                if transaction.active:
+                    transaction.overlay[path] = content
+                    transaction.dirty.add(path)
+                    return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def isfile(self, path):
+        if self.overlay_text(path) is not None:
+            return True
+        return os.path.isfile(path)
+
+    def isdir(self, path):
+        prefix = path.rstrip(os.sep) + os.sep
+        if any(p.startswith(prefix) for p in self.pending_files()):
+            return True
+        return os.path.isdir(path)
+
+    def getsize(self, path):
+        pending = self.overlay_text(path)
+        if pending is not None:
+            return len(pending.encode("utf-8"))
+        return os.path.getsize(path)
+
+    def listdir(self, path):
+        """List a directory, including files and directories that only exist in the overlay."""
+        names = set(os.listdir(path)) if os.path.isdir(path) else set()
+        prefix = path.rstrip(os.sep) + os.sep
+        for overlay_path in self.pending_files():
+            if overlay_path.startswith(prefix):
+                names.add(overlay_path[len(prefix) :].split(os.sep)[0])
+        return sorted(names)
+
+    # INTERNALS
+    # =========
+
+    def _forget(self, transaction):
+        # Called when a transaction ends; only clears it from the context that began it
+        if self._current.get() is transaction:
+            self._current.set(None)
+
+
+def _read_bytes(path):
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _file_mode(path):
+    # Keep the permissions of the file being replaced; new files get the umask default
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+# Shared by all tools; main.py gives each session its own transaction
+workspace = Workspace()
@@ -7,6 +7,9 @@ from google.genai import types
 # Add the parent directory to the path so we can import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from functions.path_index import path_index
+from functions.workspace import workspace
+
 
 def write_file(working_directory, file_path, content):
     """
@@ -32,21 +35,16 @@ def write_file(working_directory, file_path, content):
     if not target_file.startswith(abs_working_dir):
         return f'Error: Cannot write to "{file_path}" as it is outside the permitted working directory'
 
-    # STEP 2: FILE VALIDATION
-    # =========================
-
-    # Check if the path actually exists and is a file
-    if not os.path.isfile(target_file):
-        os.makedirs(os.path.dirname(target_file), exist_ok=True)
-
-    # STEP 3: WRITE FILE CONTENT
+    # STEP 2: WRITE FILE CONTENT
     # =========================
 
     try:
-        # Open the file in write mode with UTF-8 encoding
-        with open(target_file, "w", encoding="utf-8") as file:
-            # Write the content to the File
-            file.write(content)
+        # Write through the workspace: inside a session transaction the content is
+        # kept in memory until commit, otherwise it goes straight to disk
+        # (creating missing parent directories either way)
+        workspace.write_text(target_file, content)
+        # Keep the path index current so the new file can be found by name
+        path_index.add(target_file)
 
         # Return a success message
         return f'Successfully wrote to "{file_path}" {len(content)} characters written'
@@ -1,27 +1,52 @@
 import os
 import sys
+import threading
+import uuid
 
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    DIGESTS_ON_START,
+    FAST_PATH,
+    MAX_ITERATIONS,
+    MODEL,
+    MODEL_CALL_TIMEOUT,
+    MODEL_ROUTING,
+    SNAPSHOT_ON_START,
+    SYSTEM_PROMPT,
+    WORKING_DIR,
+    WORKSPACE_OVERLAY,
+)
 
-def main():
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from config import MODEL, SYSTEM_PROMPT
+# Import the call_function and available_functions from the new module
+from call_function import call_function, available_functions
+from functions.get_changes import get_changes
+from functions.get_file_digests import digest_overview
+from functions.snapshot import snapshot_store
+from functions.workspace import workspace
+from blob_store import blob_store
+from conversation import Conversation
+from fast_path import match_fast_path
+from profiling import SessionProfiler
+from progress import NoProgress, ProgressMonitor
+from routing import ModelRouter, is_error_response
+from session import DeadlineExceeded, Session, SessionCancelled, activate
 
-    # Import the call_function and available_functions from the new module
-    from call_function import call_function, available_functions
 
+def main():
     load_dotenv()
     api_key = os.environ.get("GEMINI_API_KEY")
     client = genai.Client(api_key=api_key)
     # Parse command line arguments
     verbose_mode = "--verbose" in sys.argv
-    # Get the last argument that's not --verbose
+    profile_mode = "--profile" in sys.argv
+    # Get the last argument that's not a flag
     user_prompt = None
     for arg in reversed(sys.argv[1:]):
-        if arg != "--verbose":
+        if arg not in ("--verbose", "--profile"):
             user_prompt = arg
             break
 
@@ -29,133 +54,371 @@ def main():
         print("Error: No user prompt provided")
         return
 
+    profiler = SessionProfiler(enabled=profile_mode)
+    result = run_session(client, user_prompt, verbose=verbose_mode, profiler=profiler)
+    if profiler.paths:
+        print("\nProfile written to:")
+        for path in profiler.paths:
+            print(f"  {path}")
+    return result
+
+
+def run_session(
+    client, user_prompt, verbose=False, session=None, router=None, profiler=None, monitor=None
+):
+    """
+    Run the agent loop for one prompt.
+
+    The session bounds the whole run: every model call and tool call takes
+    its timeout from the session's remaining budget, and cancelling the
+    session's token (or pressing Ctrl-C) stops the loop and kills running
+    child processes.
+
+    Args:
+        client: genai.Client, or any object with the same models.generate_content
+        user_prompt (str): The user's request
+        verbose (bool): If True, print detailed progress information
+        session (Session): Deadline and cancellation token; a new one by default
+        router (ModelRouter): Picks the model for each turn and records the choices
+            in router.turns; by default built from config
+        profiler (SessionProfiler): Profiles the loop, each tool call and each
+            model request when enabled; disabled by default
+        monitor (ProgressMonitor): Answers repeated tool calls from a memo and ends
+            a session that stops making progress; by default built from config.
+            Use one per session: its memo refers to the session's blobs
+
+    Returns:
+        str: The final response, a partial result if the session was stopped
+            early, or None if it reached the iteration limit
+    """
+    verbose_mode = verbose
+    session = session or Session()
+    profiler = profiler or SessionProfiler()
+    if router is None:
+        router = ModelRouter() if MODEL_ROUTING else ModelRouter(MODEL, MODEL)
+    monitor = monitor or ProgressMonitor()
     messages = [
         types.Content(role="user", parts=[types.Part(text=user_prompt)]),
     ]
+    if SNAPSHOT_ON_START:
+        # Give the model a snapshot ID to diff against, and what changed since the
+        # previous session, so it does not have to re-explore the tree
+        previous = snapshot_store.latest_id(WORKING_DIR)
+        messages[0].parts.append(types.Part(text=get_changes(WORKING_DIR, since=previous)))
+    if DIGESTS_ON_START:
+        # Digests of unchanged files come from the on-disk cache, so a warm session
+        # knows the codebase before its first request without re-reading it
+        overview = digest_overview(WORKING_DIR)
+        if overview:
+            messages[0].parts.append(types.Part(text=overview))
+    # Large tool payloads in the history are blob references, shared across sessions;
+    # the conversation expands them only while building each request
+    conversation = Conversation(blob_store, messages)
+    session_id = uuid.uuid4().hex
 
     # TODO: STEP 1 - ADD LOOP WRAPPER HERE
     # Add: for iteration in range(20): before the response = client.models.generate_content call
     # Add: if verbose_mode: print(f"\n--- Iteration {iteration + 1} ---") after the call
     # Indent all existing code to be inside the loop
+    transaction = None
     try:
-        for iteration in range(20):
-            response = client.models.generate_content(
-                model=MODEL,
-                contents=messages,
-                config=types.GenerateContentConfig(
-                    tools=[available_functions], system_instruction=SYSTEM_PROMPT
-                ),
-            )
+        with profiler.session(session_id), activate(session):
+            # Buffer the session's writes in its own overlay; they are committed to
+            # disk together when the session ends, or discarded if it fails part-way
+            if WORKSPACE_OVERLAY:
+                transaction = workspace.begin()
 
-            if verbose_mode:
-                print(f"\n--- Iteration {iteration + 1} ---")
-
-            # Check if there are function calls in the response first
-            # We need to process function calls before checking for final text response
-            has_function_calls = False
-            if hasattr(response, "candidates") and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, "content") and candidate.content:
-                    for part in candidate.content.parts:
-                        if hasattr(part, "function_call") and part.function_call:
-                            has_function_calls = True
-                            break
-
-            # TODO: STEP 2 - ADD COMPLETION CHECK HERE
-            # Only treat text as final response if there are no function calls
-            # If there are function calls, we need to process them first
-            if not has_function_calls and hasattr(response, "text") and response.text:
-                print(f"\nFinal response:\n{response.text}")
-                return response.text
-
-            if verbose_mode:
-                print(f" User prompt: {user_prompt}")
-                if response.usage_metadata:
-                    if hasattr(response.usage_metadata, "prompt_token_count"):
-                        print(
-                            f"Prompt tokens: {response.usage_metadata.prompt_token_count}"
-                        )
-                    if hasattr(response.usage_metadata, "candidates_token_count"):
-                        print(
-                            f"Response tokens: {response.usage_metadata.candidates_token_count}"
-                        )
-            else:
-                # Only print text if it exists and is not None
-                if hasattr(response, "text") and response.text:
-                    print(response.text)
-
-            # TODO: STEP 3 - ADD CANDIDATE HANDLING HERE
-            # Add this before the existing candidate handling code:
-            # if hasattr(response, 'candidates') and response.candidates:
-            #     for candidate in response.candidates:
-            #         if hasattr(candidate, 'content') and candidate.content:
-            #             messages.append(candidate.content)
-            if hasattr(response, "candidates") and response.candidates:
-                for candidate in response.candidates:
-                    if hasattr(candidate, "content") and candidate.content:
-                        messages.append(candidate.content)
-            # Check if there are function calls in the response run in both verbose and non-verbose mode.
-            if hasattr(response, "candidates") and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, "content") and candidate.content:
-                    for part in candidate.content.parts:
-                        if hasattr(part, "function_call") and part.function_call:
-                            # Use the new call_function to handle the function call
-                            function_call_result = call_function(
-                                part.function_call, verbose=verbose_mode
+            # Trivial commands run their tool right away; the first model request
+            # then already contains the result and can answer directly
+            fast_call = match_fast_path(user_prompt) if FAST_PATH else None
+            if fast_call is not None:
+                if verbose_mode:
+                    print(f"Fast path: {fast_call.name}({fast_call.args})")
+                with profiler.tool_call(fast_call.name):
+                    function_call_result = call_function(fast_call, verbose=verbose_mode)
+                response_data = _print_function_result(function_call_result, verbose_mode)
+                is_error = is_error_response(response_data)
+                router.record_tool_result(fast_call.name, is_error)
+                stashed = blob_store.stash(function_call_result, session_id)
+                monitor.record(fast_call, stashed, is_error)
+                conversation.append(
+                    types.Content(role="model", parts=[types.Part(function_call=fast_call)])
+                )
+                conversation.append(stashed)
+
+            for iteration in range(MAX_ITERATIONS):
+                model, reason = router.choose(iteration)
+                request = dict(
+                    contents=conversation.request_contents(),
+                    tools=[available_functions],
+                    system_instruction=SYSTEM_PROMPT,
+                )
+                response = _generate_content(client, session, model=model, **request)
+                router.record_turn(iteration, model, reason)
+
+                if verbose_mode:
+                    print(f"\n--- Iteration {iteration + 1} ---")
+                    print(f"Model: {model} ({reason})")
+                    built = conversation.stats[-1]
+                    print(
+                        f"Request: {built['contents']} contents ({built['new']} new), "
+                        f"{built['bytes']} bytes, prepared in {built['seconds'] * 1000:.2f} ms"
+                    )
+
+                # Check if there are function calls in the response first
+                # We need to process function calls before checking for final text response
+                has_function_calls = _has_function_calls(response)
+
+                # A final answer from the fast model is rewritten by the strong model,
+                # which may still decide it needs more tool calls
+                synthesis_model = router.synthesis_model(model)
+                if not has_function_calls and synthesis_model and response.text:
+                    response = _generate_content(
+                        client, session, model=synthesis_model, **request
+                    )
+                    router.record_turn(iteration, synthesis_model, "final synthesis")
+                    if verbose_mode:
+                        print(f"Model: {synthesis_model} (final synthesis)")
+                    has_function_calls = _has_function_calls(response)
+
+                # TODO: STEP 2 - ADD COMPLETION CHECK HERE
+                # Only treat text as final response if there are no function calls
+                # If there are function calls, we need to process them first
+                if not has_function_calls and hasattr(response, "text") and response.text:
+                    _commit(transaction)
+                    print(f"\nFinal response:\n{response.text}")
+                    return response.text
+
+                if verbose_mode:
+                    print(f" User prompt: {user_prompt}")
+                    if response.usage_metadata:
+                        if hasattr(response.usage_metadata, "prompt_token_count"):
+                            print(
+                                f"Prompt tokens: {response.usage_metadata.prompt_token_count}"
                             )
+                        if hasattr(response.usage_metadata, "candidates_token_count"):
+                            print(
+                                f"Response tokens: {response.usage_metadata.candidates_token_count}"
+                            )
+                else:
+                    # Only print text if it exists and is not None
+                    if hasattr(response, "text") and response.text:
+                        print(response.text)
+
+                # TODO: STEP 3 - ADD CANDIDATE HANDLING HERE
+                # Add this before the existing candidate handling code:
+                # if hasattr(response, 'candidates') and response.candidates:
+                #     for candidate in response.candidates:
+                #         if hasattr(candidate, 'content') and candidate.content:
+                #             messages.append(candidate.content)
+                if hasattr(response, "candidates") and response.candidates:
+                    for candidate in response.candidates:
+                        if hasattr(candidate, "content") and candidate.content:
+                            conversation.append(candidate.content)
+                # Check if there are function calls in the response run in both verbose and non-verbose mode.
+                if hasattr(response, "candidates") and response.candidates:
+                    candidate = response.candidates[0]
+                    if hasattr(candidate, "content") and candidate.content:
+                        for part in candidate.content.parts:
+                            if hasattr(part, "function_call") and part.function_call:
+                                # Don't start another tool once the session is over
+                                session.check()
 
-                            # Verify the response structure
-                            if (
-                                not hasattr(function_call_result, "parts")
-                                or not function_call_result.parts
-                            ):
-                                raise Exception(
-                                    "Invalid function call result structure"
+                                # A repeat of an earlier read-only call gets the earlier result
+                                function_call_result = monitor.recall(part.function_call)
+                                if function_call_result is not None:
+                                    print(f" - Reusing earlier result of {part.function_call.name}")
+                                else:
+                                    # Use the new call_function to handle the function call
+                                    with profiler.tool_call(part.function_call.name):
+                                        function_call_result = call_function(
+                                            part.function_call, verbose=verbose_mode
+                                        )
+                                # A memo hit holds blob references; show the payload itself
+                                response_data = _print_function_result(
+                                    blob_store.expand_content(function_call_result), verbose_mode
                                 )
+                                is_error = is_error_response(response_data)
+                                router.record_tool_result(part.function_call.name, is_error)
+                                # The memo keeps the stashed form: large payloads stay in the blob store
+                                stashed = blob_store.stash(function_call_result, session_id)
+                                monitor.record(part.function_call, stashed, is_error)
 
-                            if not hasattr(
-                                function_call_result.parts[0], "function_response"
-                            ):
-                                raise Exception("Missing function_response in result")
-
-                            if not hasattr(
-                                function_call_result.parts[0].function_response,
-                                "response",
-                            ):
-                                raise Exception("Missing response in function_response")
-
-                            # Always show the function result, not just in verbose mode
-                            response_data = function_call_result.parts[
-                                0
-                            ].function_response.response
-                            if isinstance(response_data, dict):
-                                if "result" in response_data:
-                                    print(f"Function result: {response_data['result']}")
-                                elif "error" in response_data:
-                                    print(f"Function error: {response_data['error']}")
-                            else:
-                                print(f"Function result: {response_data}")
-
-                            # Also show in verbose mode with the -> format
-                            if verbose_mode:
-                                print(f"-> {response_data}")
-
-                            # TODO: STEP 4 - ADD FUNCTION RESPONSE HANDLING HERE
-                            # Add this after the function call execution:
-                            # Append the structured function response to messages
-                            messages.append(function_call_result)
+                                # TODO: STEP 4 - ADD FUNCTION RESPONSE HANDLING HERE
+                                # Add this after the function call execution:
+                                # Append the structured function response to messages
+                                conversation.append(stashed)
 
+                # The tool may have been interrupted by a cancel; stop before the next model call
+                session.check()
+
+                # Nudge a loop that is going in circles; NoProgress ends it if that did not help
+                nudge = monitor.after_iteration()
+                if nudge:
+                    if verbose_mode:
+                        print(f"No progress, nudging the model: {nudge}")
+                    conversation.append(types.Content(role="user", parts=[types.Part(text=nudge)]))
+
+            _commit(transaction)
+    except DeadlineExceeded as e:
+        # Out of time: keep what the session did and report how far it got
+        _commit(transaction)
+        return _partial_result(conversation.messages, str(e))
+    except NoProgress as e:
+        # Keep what the session did; the remaining iterations would only have repeated it
+        _commit(transaction)
+        used = iteration + 1
+        return _partial_result(
+            conversation.messages,
+            f"no progress, {e}; stopped after {used} of {MAX_ITERATIONS} iterations, "
+            f"{MAX_ITERATIONS - used} saved",
+        )
+    except SessionCancelled as e:
+        _abort(transaction)
+        return _partial_result(conversation.messages, str(e))
+    except TimeoutError as e:
+        # One model call took too long; like running out of budget, keep what the session did
+        _commit(transaction)
+        return _partial_result(conversation.messages, str(e))
+    except KeyboardInterrupt:
+        # Ctrl-C cancels the session, which kills any running child process tree
+        session.token.cancel("interrupted by user")
+        _abort(transaction)
+        return _partial_result(conversation.messages, "interrupted by user")
     # TODO: STEP 5 - ADD ERROR HANDLING WRAPPER
     # Add try: before the for loop
     # Add except Exception as e: ... break after the function response handling
     except Exception as e:
+        _abort(transaction)
         if verbose_mode:
             print(f"Error: {e}")
+    except BaseException:
+        # Anything else that ends the process also rolls the session's writes back
+        _abort(transaction)
+        raise
+    finally:
+        if verbose_mode:
+            usage = blob_store.usage(session_id)
+            print(
+                f"Tool payload memory: {usage['referenced_bytes']} bytes referenced, "
+                f"{usage['unique_bytes']} bytes stored"
+            )
+            print(f"Session time: {session.elapsed():.2f} seconds")
+            print(f"Tool calls answered from memo: {monitor.memo_hits}")
+        blob_store.release(session_id)
     # TODO: STEP 6 - ADD MAX ITERATIONS MESSAGE
     # Add this after the try-except block (outside the loop):
     # print(f"\nReached maximum iterations (20) without completion.")
-    print("\nReached maximum iterations (20) without completion.")
+    print(f"\nReached maximum iterations ({MAX_ITERATIONS}) without completion.")
+
+
+def _commit(transaction):
+    if transaction is not None:
+        transaction.commit()
+
+
+def _abort(transaction):
+    if transaction is not None:
+        transaction.abort()
+
+
+def _generate_content(client, session, model, contents, **config):
+    """
+    Call client.models.generate_content within the session's budget.
+
+    The request runs on a helper thread so the session can stop waiting as
+    soon as it is cancelled or out of time; the HTTP timeout is set from the
+    same budget so the abandoned request does not linger either.
+    """
+    timeout = session.timeout(MODEL_CALL_TIMEOUT)
+    if timeout is not None:
+        config["http_options"] = types.HttpOptions(timeout=max(1, int(timeout * 1000)))
+
+    done = threading.Event()
+    outcome = {}
+
+    def request():
+        try:
+            outcome["response"] = client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(**config),
+            )
+        except BaseException as e:
+            outcome["error"] = e
+        done.set()
+
+    unregister = session.token.on_cancel(done.set)
+    try:
+        threading.Thread(target=request, daemon=True).start()
+        if not done.wait(timeout):
+            session.check()
+            raise TimeoutError(f"Model call timed out after {timeout:g} seconds")
+    finally:
+        unregister()
+    session.check()
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["response"]
+
+
+def _print_function_result(function_call_result, verbose_mode):
+    # Verify the response structure
+    if not hasattr(function_call_result, "parts") or not function_call_result.parts:
+        raise Exception("Invalid function call result structure")
+
+    if not hasattr(function_call_result.parts[0], "function_response"):
+        raise Exception("Missing function_response in result")
+
+    if not hasattr(function_call_result.parts[0].function_response, "response"):
+        raise Exception("Missing response in function_response")
+
+    # Always show the function result, not just in verbose mode
+    response_data = function_call_result.parts[0].function_response.response
+    if isinstance(response_data, dict):
+        if "result" in response_data:
+            print(f"Function result: {response_data['result']}")
+        elif "error" in response_data:
+            print(f"Function error: {response_data['error']}")
+    else:
+        print(f"Function result: {response_data}")
+
+    # Also show in verbose mode with the -> format
+    if verbose_mode:
+        print(f"-> {response_data}")
+    return response_data
+
+
+def _has_function_calls(response):
+    if hasattr(response, "candidates") and response.candidates:
+        candidate = response.candidates[0]
+        if hasattr(candidate, "content") and candidate.content:
+            for part in candidate.content.parts or []:
+                if hasattr(part, "function_call") and part.function_call:
+                    return True
+    return False
+
+
+def _partial_result(messages, reason):
+    """Summarize what a session stopped early got done, from its message history."""
+    last_text = None
+    tool_calls = []
+    for content in messages[1:]:
+        for part in content.parts or []:
+            if part.text:
+                last_text = part.text
+            if part.function_call:
+                tool_calls.append(part.function_call.name)
+
+    lines = [f"Session stopped early ({reason}) after {len(tool_calls)} tool call(s)."]
+    if tool_calls:
+        lines.append(f"Tools called: {', '.join(tool_calls)}")
+    if last_text:
+        lines.append(f"Last model output:\n{last_text}")
+    partial = "\n".join(lines)
+    print(f"\nPartial response:\n{partial}")
+    return partial
 
 
 if __name__ == "__main__":
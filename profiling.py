@@ -0,0 +1,163 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from config import PROFILE_DIR, PROFILE_TOP_N
+
+_NULL_CONTEXT = nullcontext()
+
+
+class SessionProfiler:
+    """
+    cProfile and tracemalloc instrumentation for one agent session.
+
+    session() wraps the whole loop and tool_call() wraps each tool call.
+    cProfile sees every thread on Python 3.12+, so the model requests made
+    on helper threads, including SDK serialization, are profiled as well.
+    At the end of the session three files are written to the output directory:
+
+    - <name>.pstats: cProfile statistics, for pstats or snakeviz
+    - <name>.collapsed: "frame;frame;frame microseconds" lines for flamegraph tools
+    - <name>.alloc.txt: per-tool time and peak memory, plus the top allocation sites
+
+    When disabled every method returns a shared no-op context manager.
+    """
+
+    def __init__(self, enabled=False, output_dir=PROFILE_DIR, top_n=PROFILE_TOP_N):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.paths = []
+        self._tool_stats = {}  # tool name -> [calls, seconds, peak bytes]
+        self._lock = threading.Lock()
+
+    def session(self, name="session"):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._session(name)
+
+    def tool_call(self, name):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._tool_call(name)
+
+    @contextmanager
+    def _session(self, name):
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(25)
+        try:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield self
+            finally:
+                profile.disable()
+        finally:
+            # Also write the profile when the session fails; that's often when it's wanted
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            self._write(f"{time.strftime('%Y%m%d-%H%M%S')}-{name}", profile, snapshot)
+
+    @contextmanager
+    def _tool_call(self, name):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                stats = self._tool_stats.setdefault(name, [0, 0.0, 0])
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], peak - before)
+
+    def _write(self, name, profile, snapshot):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, name)
+
+        stats = pstats.Stats(profile)
+        stats.dump_stats(f"{base}.pstats")
+
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as file:
+            for stack, micros in sorted(collapse_stacks(stats).items()):
+                file.write(f"{stack} {micros}\n")
+
+        with open(f"{base}.alloc.txt", "w", encoding="utf-8") as file:
+            file.write("Tool calls (calls, total seconds, peak traced bytes):\n")
+            for tool, (calls, seconds, peak) in sorted(self._tool_stats.items()):
+                file.write(f"  {tool}: {calls} calls, {seconds:.4f} s, {peak} bytes\n")
+            file.write(f"\nTop {self.top_n} allocation sites still alive at session end:\n")
+            snapshot = snapshot.filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                ]
+            )
+            for stat in snapshot.statistics("lineno")[: self.top_n]:
+                file.write(f"  {stat}\n")
+
+        self.paths = [f"{base}.pstats", f"{base}.collapsed", f"{base}.alloc.txt"]
+
+
+def collapse_stacks(stats, max_depth=64):
+    """
+    Turn pstats call-graph data into collapsed stacks for flamegraph tools.
+
+    cProfile records caller/callee edges, not full stacks, so a function's
+    self time is split across the paths reaching it in proportion to the
+    time each incoming edge accounts for.
+
+    Returns:
+        dict: "root;...;leaf" -> self time in microseconds
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    roots = [
+        func
+        for func, (_, _, _, _, callers) in entries.items()
+        if not callers or set(callers) == {func}
+    ]
+
+    collapsed = {}
+
+    def walk(func, path, fraction):
+        _, _, self_time, _, _ = entries[func]
+        path = path + [_label(func)]
+        micros = int(self_time * fraction * 1_000_000)
+        if micros:
+            key = ";".join(path)
+            collapsed[key] = collapsed.get(key, 0) + micros
+        if len(path) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = entries[callee][3]
+            if callee == func or not callee_total or _label(callee) in path:
+                continue
+            share = min(1.0, edge_time * fraction / callee_total)
+            if share * callee_total >= 1e-6:
+                walk(callee, path, share)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return collapsed
+
+
+def _label(func):
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-in functions have no source location
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
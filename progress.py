@@ -0,0 +1,130 @@
+import hashlib
+import json
+from collections import Counter, deque
+
+from google.genai import types
+
+from config import PROGRESS_ERROR_STREAK, PROGRESS_REPEAT_LIMIT, PROGRESS_WINDOW
+
+# Tools whose calls can change what other tools return; a successful call
+# clears the memo. Their own results are never replayed from it.
+STATE_CHANGING_TOOLS = {"write_file", "run_python_file", "run_tests"}
+
+
+class NoProgress(Exception):
+    """Raised when the agent loop keeps going without progress after being nudged."""
+
+
+class ProgressMonitor:
+    """
+    Notices when the agent loop stops making progress.
+
+    Every tool call is recorded with a fingerprint of its arguments and of
+    its result. Within the last `window` tool calls, the loop counts as
+    stuck when the same call returned the same result `repeat_limit` times,
+    or when the last `error_streak` calls all failed.
+
+    Repeated read-only calls are answered from a session memo instead of
+    running the tool again. The memo holds results as stashed in the blob
+    store, so large payloads are kept there once, as references, rather
+    than a second time here. A memo hit also counts towards the repeat
+    limit. The first time the loop is stuck, after_iteration() returns a
+    nudge for the model. The second time, it raises NoProgress so the
+    session can end early.
+    """
+
+    def __init__(
+        self,
+        window=PROGRESS_WINDOW,
+        repeat_limit=PROGRESS_REPEAT_LIMIT,
+        error_streak=PROGRESS_ERROR_STREAK,
+    ):
+        self.repeat_limit = repeat_limit
+        self.error_streak = error_streak
+        self.nudged = False
+        self.memo_hits = 0
+        self._events = deque(maxlen=window)  # (call key, result key, is_error)
+        self._memo = {}  # call key -> stashed function response dict
+        self._errors = 0
+
+    def recall(self, function_call):
+        """Return the memoized result of an identical earlier call as types.Content, or None."""
+        if function_call.name in STATE_CHANGING_TOOLS:
+            return None
+        response = self._memo.get(_call_key(function_call))
+        if response is None:
+            return None
+        self.memo_hits += 1
+        note = "Same call and arguments as before, nothing has changed since: this is the earlier result."
+        return types.Content(
+            role="tool",
+            parts=[
+                types.Part.from_function_response(
+                    name=function_call.name, response={**response, "note": note}
+                )
+            ],
+        )
+
+    def record(self, function_call, result, is_error):
+        """
+        Record a tool call and its result: the types.Content the tool call
+        produced, after BlobStore.stash. A payload moved into the blob store
+        is fingerprinted by its reference, which is its content hash.
+        """
+        call_key = _call_key(function_call)
+        response = result.parts[0].function_response.response or {}
+        response = {key: value for key, value in response.items() if key != "note"}
+        self._events.append((call_key, _digest(response), is_error))
+        self._errors = self._errors + 1 if is_error else 0
+        if function_call.name in STATE_CHANGING_TOOLS:
+            if not is_error:
+                self._memo.clear()
+        else:
+            self._memo[call_key] = response
+
+    def stuck(self):
+        """Return why the loop looks stuck, or None."""
+        if self.error_streak and self._errors >= self.error_streak:
+            return f"the last {self._errors} tool calls failed"
+        counts = Counter((call, result) for call, result, _ in self._events)
+        if counts:
+            (call, _), repeats = counts.most_common(1)[0]
+            if self.repeat_limit and repeats >= self.repeat_limit:
+                return f"{json.loads(call)['name']} was called {repeats} times with the same arguments and result"
+        return None
+
+    def after_iteration(self):
+        """
+        Check for progress once the iteration's tool calls are done.
+
+        Returns:
+            str: A nudge to send to the model the first time the loop is stuck, else None
+
+        Raises:
+            NoProgress: If the loop is stuck again after the nudge
+        """
+        reason = self.stuck()
+        if reason is None:
+            return None
+        if self.nudged:
+            raise NoProgress(reason)
+        self.nudged = True
+        # Require fresh evidence before stopping: judge only the calls made after the nudge
+        self._events.clear()
+        self._errors = 0
+        return (
+            f"You are not making progress: {reason}. Repeating it will not change the "
+            "outcome. Use the results you already have, try a different approach, or give "
+            "your final answer now."
+        )
+
+
+def _call_key(function_call):
+    return json.dumps(
+        {"name": function_call.name, "args": function_call.args or {}}, sort_keys=True, default=str
+    )
+
+
+def _digest(response):
+    encoded = json.dumps(response, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
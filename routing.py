@@ -0,0 +1,90 @@
+from config import (
+    FAST_MODEL,
+    ROUTE_ESCALATE_AFTER_ERRORS,
+    ROUTE_ITERATION_TIERS,
+    ROUTE_STRONG_SYNTHESIS,
+    ROUTE_TOOL_TIERS,
+    STRONG_MODEL,
+)
+
+FAST = "fast"
+STRONG = "strong"
+
+
+class ModelRouter:
+    """
+    Chooses which model serves each turn of the agent loop.
+
+    Turns that only pick the next tool call go to the fast model. The loop
+    escalates to the strong model to write the final answer, after a streak
+    of tool errors, after calls to tools configured as needing it, and on
+    iterations pinned to it. Every decision is recorded in `turns`.
+
+    A final answer that rests on a single successful tool call, such as a
+    fast path command, is used as the fast model wrote it: rewriting it
+    would double the model calls of the simplest sessions for little gain.
+    """
+
+    def __init__(
+        self,
+        fast_model=FAST_MODEL,
+        strong_model=STRONG_MODEL,
+        tool_tiers=ROUTE_TOOL_TIERS,
+        iteration_tiers=ROUTE_ITERATION_TIERS,
+        escalate_after_errors=ROUTE_ESCALATE_AFTER_ERRORS,
+        strong_synthesis=ROUTE_STRONG_SYNTHESIS,
+    ):
+        self.models = {FAST: fast_model, STRONG: strong_model}
+        self.tool_tiers = dict(tool_tiers)
+        self.iteration_tiers = dict(iteration_tiers)
+        self.escalate_after_errors = escalate_after_errors
+        self.strong_synthesis = strong_synthesis
+        self.turns = []
+        self._error_streak = 0
+        self._last_tools = []
+        self._tool_calls = 0
+        self._tool_errors = 0
+
+    def choose(self, iteration):
+        """Return (model, reason) for the model call at the given 0-based iteration."""
+        if iteration in self.iteration_tiers:
+            tier = self.iteration_tiers[iteration]
+            return self.models[tier], f"iteration {iteration + 1} pinned to {tier}"
+        if self.escalate_after_errors and self._error_streak >= self.escalate_after_errors:
+            return self.models[STRONG], f"{self._error_streak} consecutive tool errors"
+        for name in self._last_tools:
+            if self.tool_tiers.get(name) == STRONG:
+                return self.models[STRONG], f"result of {name}"
+        return self.models[FAST], "tool selection"
+
+    def synthesis_model(self, served_by):
+        """
+        Return the model that should rewrite a final answer produced by served_by,
+        or None if that answer can be used as is.
+        """
+        if not self.strong_synthesis or served_by == self.models[STRONG]:
+            return None
+        if self._tool_calls == 1 and self._tool_errors == 0:
+            return None
+        return self.models[STRONG]
+
+    def record_turn(self, iteration, model, reason):
+        self.turns.append({"iteration": iteration + 1, "model": model, "reason": reason})
+        # Tool results from the previous turn have now been seen by a model
+        self._last_tools = []
+
+    def record_tool_result(self, name, is_error):
+        self._last_tools.append(name)
+        self._tool_calls += 1
+        self._tool_errors += 1 if is_error else 0
+        self._error_streak = self._error_streak + 1 if is_error else 0
+
+
+def is_error_response(response_data):
+    """Return True if a function response reports a failure."""
+    if not isinstance(response_data, dict):
+        return False
+    if "error" in response_data:
+        return True
+    result = response_data.get("result")
+    return isinstance(result, str) and result.startswith("Error")
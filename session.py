@@ -0,0 +1,123 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from config import SESSION_BUDGET_SECONDS
+
+
+class SessionCancelled(Exception):
+    """Raised when work is attempted after the session was cancelled."""
+
+
+class DeadlineExceeded(SessionCancelled):
+    """Raised when the session's wall-clock budget has run out."""
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag with callbacks.
+
+    Callbacks registered with on_cancel() run once, on the thread that calls
+    cancel(). The scheduler uses them to kill running child process trees.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason="cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Register callback to run on cancel; returns a function that unregisters it."""
+        with self._lock:
+            if not self._event.is_set():
+                key = self._next_id
+                self._next_id += 1
+                self._callbacks[key] = callback
+                return lambda: self._callbacks.pop(key, None)
+        # Already cancelled: run it right away
+        callback()
+        return lambda: None
+
+    def wait(self, timeout=None):
+        """Block until cancelled or timeout seconds passed; returns True if cancelled."""
+        return self._event.wait(timeout)
+
+
+class Session:
+    """Wall-clock deadline and cancellation token shared by one agent session."""
+
+    def __init__(self, budget_seconds=SESSION_BUDGET_SECONDS, token=None):
+        self.budget_seconds = budget_seconds
+        self.started_at = time.monotonic()
+        self.deadline = None if budget_seconds is None else self.started_at + budget_seconds
+        self.token = token or CancellationToken()
+
+    def remaining(self):
+        """Seconds left in the budget, or None for an unbounded session."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def check(self):
+        """Raise if the session was cancelled or its budget has run out."""
+        if self.remaining() == 0.0:
+            self.token.cancel(f"time budget of {self.budget_seconds} seconds exhausted")
+        if self.token.cancelled:
+            if self.deadline is not None and self.remaining() == 0.0:
+                raise DeadlineExceeded(self.token.reason)
+            raise SessionCancelled(self.token.reason)
+
+    def timeout(self, cap=None):
+        """
+        Derive a timeout for one model or tool call from the remaining budget.
+
+        Returns:
+            float: min(cap, remaining budget), or cap for an unbounded session
+
+        Raises:
+            SessionCancelled: If the session is already cancelled or out of time
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(cap, remaining)
+
+
+_current = contextvars.ContextVar("agent_session", default=None)
+
+
+def current_session():
+    """Return the session active in this context, or None outside a session."""
+    return _current.get()
+
+
+@contextmanager
+def activate(session):
+    """Make session the current session for tool calls made in this context."""
+    reset_token = _current.set(session)
+    try:
+        yield session
+    finally:
+        _current.reset(reset_token)
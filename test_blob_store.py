@@ -0,0 +1,59 @@
+import os
+
+from google.genai import types
+
+from blob_store import BlobStore
+
+
+def tool_result(value):
+    return types.Content(
+        role="tool",
+        parts=[types.Part.from_function_response(name="get_file_content", response={"result": value})],
+    )
+
+
+def test_identical_payloads_are_stored_once():
+    store = BlobStore(inline_limit=16)
+    first = store.stash(tool_result("x" * 100), "a")
+    second = store.stash(tool_result("x" * 100), "b")
+    small = store.stash(tool_result("short"), "a")
+
+    assert first.parts[0].function_response.response == second.parts[0].function_response.response
+    assert small.parts[0].function_response.response == {"result": "short"}
+    assert store.usage() == {"memory_bytes": 100, "spilled_bytes": 0, "blobs": 1}
+    store.stash(tool_result("x" * 100), "a")
+    assert store.usage("a")["referenced_bytes"] == 200
+    assert store.usage("a")["unique_bytes"] == 100
+    assert store.expand_content(first).parts[0].function_response.response == {"result": "x" * 100}
+    store.close()
+
+
+def test_least_recently_used_payloads_spill_and_read_back():
+    store = BlobStore(inline_limit=16, memory_limit=250)
+    stashed = [store.stash(tool_result(c * 100), "a") for c in "xyz"]
+
+    assert store.usage() == {"memory_bytes": 200, "spilled_bytes": 100, "blobs": 3}
+    assert store.references(stashed[0])[0] in store._spilled
+    assert not store.resident(store.references(stashed[0]))
+    expanded = store.expand_content(stashed[0])
+    assert expanded.parts[0].function_response.response == {"result": "x" * 100}
+    store.close()
+
+
+def test_release_frees_blobs_nobody_references():
+    store = BlobStore(inline_limit=16, memory_limit=150)
+    shared = store.stash(tool_result("x" * 100), "a")
+    store.stash(tool_result("x" * 100), "b")
+    store.stash(tool_result("y" * 100), "a")  # spills the shared payload
+    spill_file = store._spilled[store.references(shared)[0]]
+    assert os.path.exists(spill_file)
+
+    store.release("a")
+    # Session b still refers to the spilled payload
+    assert store.usage() == {"memory_bytes": 0, "spilled_bytes": 100, "blobs": 1}
+    assert os.path.exists(spill_file)
+
+    store.release("b")
+    assert store.usage() == {"memory_bytes": 0, "spilled_bytes": 0, "blobs": 0}
+    assert not os.path.exists(spill_file)
+    store.close()
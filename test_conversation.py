@@ -0,0 +1,66 @@
+from google.genai import types
+
+from blob_store import BlobStore
+from conversation import Conversation
+
+
+class CountingBlobStore(BlobStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.expanded = 0
+
+    def expand_content(self, content):
+        self.expanded += 1
+        return super().expand_content(content)
+
+
+def tool_result(value):
+    return types.Content(
+        role="tool",
+        parts=[types.Part.from_function_response(name="get_file_content", response={"result": value})],
+    )
+
+
+def test_each_entry_is_prepared_once():
+    store = CountingBlobStore(inline_limit=16)
+    conversation = Conversation(store, [types.Content(role="user", parts=[types.Part(text="hi")])])
+
+    first = conversation.request_contents()
+    conversation.append(types.Content(role="model", parts=[types.Part(text="reading")]))
+    conversation.append(store.stash(tool_result("x" * 100), "session"))
+    second = conversation.request_contents()
+    third = conversation.request_contents()
+
+    assert store.expanded == 1
+    assert [s["new"] for s in conversation.stats] == [1, 2, 0]
+    assert [s["expanded"] for s in conversation.stats] == [0, 1, 0]
+    assert [s["contents"] for s in conversation.stats] == [1, 3, 3]
+    assert second[0] is first[0] is conversation.messages[0]
+    assert third[2] is second[2]
+    # The request carries the payload, the history only the reference
+    assert second[2].parts[0].function_response.response == {"result": "x" * 100}
+    assert "$blob" in conversation.messages[2].parts[0].function_response.response["result"]
+    # Sizes come from the payloads and blob sizes, not from encoding the requests
+    assert [s["bytes"] for s in conversation.stats] == [2, 2 + 7 + 6 + 100, 115]
+    store.close()
+
+
+def test_spilled_payloads_are_not_kept_expanded():
+    # Room for one 100-byte payload in memory; the older one spills
+    store = CountingBlobStore(inline_limit=16, memory_limit=150)
+    conversation = Conversation(store, [store.stash(tool_result("x" * 100), "session")])
+    conversation.request_contents()
+    assert store.expanded == 1
+
+    conversation.append(store.stash(tool_result("y" * 100), "session"))
+    conversation.request_contents()
+    # The new entry is cached; the spilled one was dropped and is expanded from disk
+    assert store.expanded == 3
+    assert "$blob" in conversation._contents[0].parts[0].function_response.response["result"]
+    assert conversation._contents[1].parts[0].function_response.response == {"result": "y" * 100}
+
+    contents = conversation.request_contents()
+    assert store.expanded == 4
+    assert contents[0].parts[0].function_response.response == {"result": "x" * 100}
+    assert [s["expanded"] for s in conversation.stats] == [1, 2, 1]
+    store.close()
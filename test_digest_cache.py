@@ -0,0 +1,56 @@
+import os
+
+from functions.digest_cache import DigestCache
+
+
+def test_digests_are_reused_across_instances_and_invalidated_by_content(tmp_path):
+    source = tmp_path / "shapes.py"
+    source.write_text(
+        '"""Geometry helpers."""\n\n'
+        "class Square:\n"
+        "    def __init__(self, side):\n"
+        "        self.side = side\n\n"
+        "    def area(self):\n"
+        "        return self.side**2\n\n"
+        "    def _check(self):\n"
+        "        pass\n\n"
+        "def _helper():\n"
+        "    pass\n"
+    )
+    cache_dir = tmp_path / "cache"
+
+    cold = DigestCache(cache_dir)
+    digest = cold.get(source)
+    assert (cold.hits, cold.misses) == (0, 1)
+    assert digest["summary"] == "Geometry helpers."
+    assert digest["api"] == ["class Square", "    def __init__(self, side)", "    def area(self)"]
+    assert digest["outline"][0] == "class Square  [lines 3-11]"
+
+    # A new process (here: a new instance) finds the digest on disk
+    warm = DigestCache(cache_dir)
+    assert warm.get(source) == digest
+    assert (warm.hits, warm.misses) == (1, 0)
+
+    source.write_text('"""Geometry helpers, version 2."""\n')
+    os.utime(source, ns=(0, 0))  # make sure the stat data changes even on coarse clocks
+    changed = warm.get(source)
+    assert changed["summary"] == "Geometry helpers, version 2."
+    assert changed["sha256"] != digest["sha256"]
+    assert (warm.hits, warm.misses) == (1, 1)
+
+
+def test_same_content_is_digested_per_kind(tmp_path):
+    content = "# shapes.py\n# Square and circle helpers.\nclass Square:\n    pass\n"
+    (tmp_path / "shapes.py").write_text(content)
+    (tmp_path / "shapes.txt").write_text(content)
+    (tmp_path / "copy.py").write_text(content)
+    cache = DigestCache(tmp_path / "cache")
+
+    python = cache.get(tmp_path / "shapes.py")
+    text = cache.get(tmp_path / "shapes.txt")
+    assert python["api"] == ["class Square"]
+    assert python["summary"] == "Square and circle helpers."
+    assert text["api"] == [] and text["summary"] == "# shapes.py"
+    # A Python file with the same content shares the entry, whatever its name
+    assert cache.get(tmp_path / "copy.py") == python
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+
+import functions.evaluate_expression as evaluate_expression_module
+from functions.evaluate_expression import CalculatorRuntime, evaluate_expression
+from functions.run_python import run_python_file
+from functions.workspace import workspace
+
+WORKING_DIR = "calculator"
+
+
+def test_single_expression_matches_main_py():
+    result = evaluate_expression(WORKING_DIR, expression="3 * 4 + 5")
+    assert result == '{\n  "expression": "3 * 4 + 5",\n  "result": 17\n}'
+    assert result in run_python_file(WORKING_DIR, "main.py", ["3 * 4 + 5"])
+
+
+def test_batch_returns_one_line_per_expression():
+    result = evaluate_expression(WORKING_DIR, expressions=["3 + 5", "10 / 4", "$ 3 5"])
+    assert result.splitlines() == [
+        '{"expression": "3 + 5", "result": 8}',
+        '{"expression": "10 / 4", "result": 2.5}',
+        "Error: invalid token: $",
+    ]
+
+
+def test_modified_sources_are_not_loaded_in_process():
+    runtime = CalculatorRuntime(WORKING_DIR)
+    assert runtime.load() is not None
+
+    path = os.path.abspath(os.path.join(WORKING_DIR, "pkg/render.py"))
+    transaction = workspace.begin()
+    try:
+        workspace.write_text(path, workspace.read_text(path) + "\n# edited\n")
+        assert runtime.load() is None
+    finally:
+        transaction.abort()
+    assert runtime.load() is not None
+
+
+def copy_calculator(root, commit):
+    shutil.copytree(WORKING_DIR, root, ignore=shutil.ignore_patterns("__pycache__"))
+    if commit:
+        git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        subprocess.run(git + ["init", "-q"], cwd=root, check=True)
+        subprocess.run(git + ["add", "."], cwd=root, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "calculator"], cwd=root, check=True)
+    return str(root)
+
+
+def test_sources_that_differ_from_git_are_not_loaded_in_process(tmp_path, monkeypatch):
+    root = copy_calculator(tmp_path / "calculator", commit=True)
+    runtime = CalculatorRuntime(root)
+    assert runtime.untrusted_reason() is None
+
+    # As if an earlier session had committed an edit before this process started
+    with open(os.path.join(root, "pkg/render.py"), "a") as file:
+        file.write("\n# edited by an earlier session\n")
+    assert runtime.load() is None
+    assert "differ from the version committed to git" in runtime.untrusted_reason()
+
+    monkeypatch.setattr(evaluate_expression_module, "calculator_runtime", runtime)
+    result = evaluate_expression(root, expressions=["3 + 5", "-3 * 2", "$ 3 5"])
+    # The whole batch runs in one child process, with the same output as in process
+    assert result.splitlines() == [
+        "[Evaluated in a child process, because the calculator sources differ from the version committed to git]",
+        '{"expression": "3 + 5", "result": 8}',
+        '{"expression": "-3 * 2", "result": -6}',
+        "Error: invalid token: $",
+    ]
+
+
+def test_uncommitted_sources_are_not_loaded_in_process(tmp_path):
+    runtime = CalculatorRuntime(copy_calculator(tmp_path / "calculator", commit=False))
+
+    assert runtime.load() is None
+    assert "not committed to git" in runtime.untrusted_reason()
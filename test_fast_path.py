@@ -0,0 +1,46 @@
+from google.genai import types
+
+from config import FAST_MODEL
+from fast_path import match_fast_path
+from main import run_session
+from test_routing import FakeClient, text
+
+
+def test_matches_system_prompt_examples():
+    assert match_fast_path("run tests.py").args == {"file_path": "tests.py"}
+    assert match_fast_path('run main.py "3 + 5"').args == {
+        "file_path": "main.py",
+        "args": ["3 + 5"],
+    }
+    assert match_fast_path("read main.py").name == "get_file_content"
+    assert match_fast_path("list directory contents").args == {"directory": "."}
+    assert match_fast_path("what is 3 + 5?").args == {"expression": "3 + 5"}
+    assert match_fast_path("calculate 2*3-1.5").args == {"expression": "2 * 3 - 1.5"}
+    assert match_fast_path("how does the calculator work?") is None
+
+
+def test_expression_keeps_signs_on_negative_numbers():
+    def expression(prompt):
+        return match_fast_path(prompt).args["expression"]
+
+    assert expression("calculate -3 + 5") == "-3 + 5"
+    assert expression("calculate 3 - -2") == "3 - -2"
+    assert expression("calculate 2 * -1") == "2 * -1"
+    assert expression("calculate 2*-1.5") == "2 * -1.5"
+    assert expression("calculate 3 -2") == "3 - 2"
+    assert expression("calculate 5-3") == "5 - 3"
+
+
+def test_trivial_command_needs_one_model_call():
+    client = FakeClient([text("The pkg directory holds the calculator modules.")])
+
+    # With the default router, as configured
+    run_session(client, "list the contents of the pkg directory")
+
+    assert client.models.models == [FAST_MODEL]
+    # The single request already carries the tool call and its result
+    contents = client.models.requests[0]
+    assert contents[1].parts[0].function_call == types.FunctionCall(
+        name="get_files_info", args={"directory": "pkg"}
+    )
+    assert "calculator.py" in contents[2].parts[0].function_response.response["result"]
@@ -0,0 +1,77 @@
+from google.genai import types
+
+import call_function as call_function_module
+from call_function import call_function
+from functions.path_index import PathIndex
+
+
+def make_tree(root):
+    (root / "pkg").mkdir()
+    (root / "pkg" / "calculator.py").write_text("x = 1\n")
+    (root / "pkg" / "render.py").write_text("y = 2\n")
+    (root / "tools").mkdir()
+    (root / "tools" / "render.py").write_text("z = 3\n")
+    (root / "main.py").write_text("print('hi')\n")
+
+
+def test_resolves_bare_and_partial_paths(tmp_path):
+    make_tree(tmp_path)
+    index = PathIndex()
+
+    assert index.resolve(tmp_path, "main.py") == ["main.py"]
+    assert index.resolve(tmp_path, "calculator.py") == ["pkg/calculator.py"]
+    assert index.resolve(tmp_path, "pkg/render.py") == ["pkg/render.py"]
+    assert index.resolve(tmp_path, "render.py") == ["pkg/render.py", "tools/render.py"]
+    assert index.resolve(tmp_path, "missing.py") == []
+    assert index.resolve(tmp_path, "pkg", kind="dir") == ["pkg"]
+    assert index.resolve(tmp_path, "../calculator.py") == []
+
+
+def test_picks_up_new_and_deleted_files(tmp_path):
+    make_tree(tmp_path)
+    index = PathIndex()
+    assert index.resolve(tmp_path, "extra.py") == []
+
+    # Created behind the index's back, found by re-listing the changed directory
+    (tmp_path / "tools" / "extra.py").write_text("")
+    assert index.resolve(tmp_path, "extra.py") == ["tools/extra.py"]
+
+    # Recorded directly, as write_file does
+    (tmp_path / "pkg" / "new").mkdir()
+    (tmp_path / "pkg" / "new" / "module.py").write_text("")
+    index.add(tmp_path / "pkg" / "new" / "module.py")
+    assert index.resolve(tmp_path, "new/module.py") == ["pkg/new/module.py"]
+
+    (tmp_path / "tools" / "render.py").unlink()
+    assert index.resolve(tmp_path, "render.py") == ["pkg/render.py"]
+
+
+def test_call_function_resolves_or_lists_candidates(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.setattr(call_function_module, "WORKING_DIR", str(tmp_path))
+
+    content = call_function(
+        types.FunctionCall(name="get_file_content", args={"file_path": "calculator.py"})
+    )
+    assert content.parts[0].function_response.response == {"result": "x = 1\n"}
+
+    content = call_function(
+        types.FunctionCall(name="get_file_content", args={"file_path": "render.py"})
+    )
+    result = content.parts[0].function_response.response["result"]
+    assert result.startswith('Error: "render.py" is ambiguous')
+    assert "pkg/render.py, tools/render.py" in result
+
+
+def test_ambiguous_list_entries_do_not_fail_the_whole_call(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.setattr(call_function_module, "WORKING_DIR", str(tmp_path))
+
+    content = call_function(
+        types.FunctionCall(name="get_files_content", args={"file_paths": ["main.py", "render.py"]})
+    )
+    result = content.parts[0].function_response.response["result"]
+    assert result.startswith(
+        'Note: "render.py" is ambiguous, it could be any of: pkg/render.py, tools/render.py'
+    )
+    assert "print('hi')" in result
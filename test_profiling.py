@@ -0,0 +1,79 @@
+import os
+
+from profiling import SessionProfiler, collapse_stacks
+
+
+class FakeStats:
+    """pstats-shaped data: func -> (calls, calls, self time, total time, {caller: edge})."""
+
+    def __init__(self, entries):
+        self.stats = entries
+
+
+def func(name):
+    return ("m.py", 1, name)
+
+
+def edge(total):
+    return (1, 1, 0.0, total)
+
+
+# main calls a and b; both call leaf, b also calls the recursive rec
+TREE = FakeStats(
+    {
+        func("main"): (1, 1, 0.001, 0.010, {}),
+        func("a"): (1, 1, 0.002, 0.004, {func("main"): edge(0.004)}),
+        func("b"): (1, 1, 0.001, 0.005, {func("main"): edge(0.005)}),
+        func("leaf"): (2, 2, 0.004, 0.004, {func("a"): edge(0.002), func("b"): edge(0.002)}),
+        func("rec"): (2, 1, 0.002, 0.002, {func("b"): edge(0.002), func("rec"): edge(0.001)}),
+    }
+)
+
+
+def test_self_time_is_split_across_call_edges():
+    assert collapse_stacks(TREE) == {
+        "main (m.py:1)": 1000,
+        "main (m.py:1);a (m.py:1)": 2000,
+        "main (m.py:1);a (m.py:1);leaf (m.py:1)": 2000,
+        "main (m.py:1);b (m.py:1)": 1000,
+        "main (m.py:1);b (m.py:1);leaf (m.py:1)": 2000,
+        # Recursive calls are folded into the first frame of the function
+        "main (m.py:1);b (m.py:1);rec (m.py:1)": 2000,
+    }
+
+
+def test_stacks_are_cut_at_max_depth():
+    assert set(collapse_stacks(TREE, max_depth=2)) == {
+        "main (m.py:1)",
+        "main (m.py:1);a (m.py:1)",
+        "main (m.py:1);b (m.py:1)",
+    }
+
+
+def inner():
+    return sum(i * i for i in range(20_000))
+
+
+def outer():
+    return [inner() for _ in range(3)]
+
+
+def test_profiled_session_writes_three_files(tmp_path):
+    profiler = SessionProfiler(enabled=True, output_dir=str(tmp_path))
+
+    with profiler.session("test"):
+        with profiler.tool_call("work"):
+            outer()
+
+    assert [os.path.splitext(path)[1] for path in profiler.paths] == [".pstats", ".collapsed", ".txt"]
+    assert all(os.path.exists(path) for path in profiler.paths)
+    assert profiler.paths[2].endswith("-test.alloc.txt")
+    with open(profiler.paths[1], encoding="utf-8") as file:
+        stacks = [line.rsplit(" ", 1)[0] for line in file]
+    assert any(
+        f"outer (test_profiling.py:{outer.__code__.co_firstlineno});"
+        f"inner (test_profiling.py:{inner.__code__.co_firstlineno})" in stack
+        for stack in stacks
+    )
+    with open(profiler.paths[2], encoding="utf-8") as file:
+        assert "  work: 1 calls" in file.read()
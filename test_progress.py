@@ -0,0 +1,67 @@
+from google.genai import types
+
+from blob_store import BlobStore
+from main import run_session
+from progress import ProgressMonitor
+from test_routing import FakeClient, function_call
+
+
+def result(name, value):
+    return types.Content(
+        role="tool",
+        parts=[types.Part.from_function_response(name=name, response={"result": value})],
+    )
+
+
+def test_repeated_calls_come_from_memo_and_end_the_session_early():
+    client = FakeClient([function_call("get_files_info", directory="pkg")] * 20)
+    monitor = ProgressMonitor(window=6, repeat_limit=3, error_streak=4)
+
+    result = run_session(client, "look around", monitor=monitor)
+
+    # Stuck after 3 identical calls, nudged, stuck again 3 calls later
+    assert len(client.models.requests) == 6
+    assert "stopped after 6 of 20 iterations, 14 saved" in result
+    assert monitor.memo_hits == 5
+    nudge = client.models.requests[3][-1]
+    assert nudge.role == "user" and "not making progress" in nudge.parts[0].text
+
+
+def test_error_streak_ends_the_session_early():
+    client = FakeClient(
+        [function_call("get_file_content", file_path=f"missing{i}.py") for i in range(20)]
+    )
+    monitor = ProgressMonitor(window=6, repeat_limit=3, error_streak=4)
+
+    result = run_session(client, "find the config", monitor=monitor)
+
+    assert len(client.models.requests) == 8
+    assert "the last 4 tool calls failed" in result
+    assert "12 saved" in result
+    assert monitor.memo_hits == 0
+
+
+def test_state_changing_calls_clear_the_memo():
+    monitor = ProgressMonitor()
+    read = function_call("get_files_info", directory="pkg").candidates[0].content.parts[0].function_call
+    write = function_call("write_file", file_path="a.txt", content="x").candidates[0].content.parts[0].function_call
+
+    monitor.record(read, result("get_files_info", "a.txt"), is_error=False)
+    assert monitor.recall(read) is not None
+    monitor.record(write, result("write_file", "Successfully wrote"), is_error=False)
+    assert monitor.recall(read) is None
+    assert monitor.recall(write) is None
+
+
+def test_memo_keeps_large_results_as_blob_references():
+    store = BlobStore(inline_limit=16)
+    monitor = ProgressMonitor()
+    read = function_call("get_file_content", file_path="big.py").candidates[0].content.parts[0].function_call
+
+    monitor.record(read, store.stash(result("get_file_content", "x" * 1000), "session"), is_error=False)
+    recalled = monitor.recall(read)
+
+    assert set(recalled.parts[0].function_response.response["result"]) == {"$blob", "bytes"}
+    expanded = store.expand_content(recalled)
+    assert expanded.parts[0].function_response.response["result"] == "x" * 1000
+    store.close()
@@ -0,0 +1,103 @@
+from google.genai import types
+
+from main import run_session
+from routing import ModelRouter
+
+
+class FakeModels:
+    """Stands in for client.models, replaying canned responses and recording each request."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.models = []
+        self.requests = []
+
+    def generate_content(self, model, contents, config):
+        self.models.append(model)
+        self.requests.append(contents)
+        return self.responses.pop(0)
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.models = FakeModels(responses)
+
+
+def function_call(name, **args):
+    part = types.Part(function_call=types.FunctionCall(name=name, args=args))
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))]
+    )
+
+
+def text(value):
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(content=types.Content(role="model", parts=[types.Part(text=value)]))
+        ]
+    )
+
+
+def test_tool_turns_use_fast_model_and_synthesis_uses_strong():
+    client = FakeClient(
+        [
+            function_call("get_files_info", directory="."),
+            function_call("get_files_info", directory="pkg"),
+            text("draft"),
+            text("final"),
+        ]
+    )
+    router = ModelRouter("fast-model", "strong-model", tool_tiers={}, iteration_tiers={})
+
+    assert run_session(client, "what files are here?", router=router) == "final"
+    assert client.models.models == ["fast-model"] * 3 + ["strong-model"]
+    assert [turn["reason"] for turn in router.turns] == [
+        "tool selection",
+        "tool selection",
+        "tool selection",
+        "final synthesis",
+    ]
+
+
+def test_answer_after_one_successful_tool_call_is_not_rewritten():
+    client = FakeClient([function_call("get_files_info", directory="."), text("draft")])
+    router = ModelRouter("fast-model", "strong-model", tool_tiers={}, iteration_tiers={})
+
+    assert run_session(client, "what files are here?", router=router) == "draft"
+    assert client.models.models == ["fast-model", "fast-model"]
+
+
+def test_escalates_after_repeated_tool_errors():
+    client = FakeClient(
+        [
+            function_call("get_file_content", file_path="missing.py"),
+            function_call("get_file_content", file_path="missing.py"),
+            text("answer"),
+        ]
+    )
+    router = ModelRouter(
+        "fast-model",
+        "strong-model",
+        tool_tiers={},
+        iteration_tiers={},
+        escalate_after_errors=2,
+        strong_synthesis=False,
+    )
+
+    assert run_session(client, "what is in missing.py?", router=router) == "answer"
+    assert client.models.models == ["fast-model", "fast-model", "strong-model"]
+    assert router.turns[-1]["reason"] == "2 consecutive tool errors"
+
+
+def test_iteration_and_tool_tiers():
+    router = ModelRouter(
+        "fast-model",
+        "strong-model",
+        tool_tiers={"run_tests": "strong"},
+        iteration_tiers={0: "strong"},
+    )
+
+    assert router.choose(0)[0] == "strong-model"
+    assert router.choose(1)[0] == "fast-model"
+    router.record_tool_result("run_tests", is_error=False)
+    assert router.choose(1) == ("strong-model", "result of run_tests")
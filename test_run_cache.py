@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from functions.run_cache import RunCache
+from session import Session, SessionCancelled, activate
+
+
+def start_leader(cache, session, release, outcome):
+    """Start a run of "key" in another thread; it blocks until release is set."""
+    started = threading.Event()
+
+    def run():
+        started.set()
+        release.wait(5)
+        session.check()
+        return "leader result"
+
+    def leader():
+        with activate(session):
+            try:
+                outcome["leader"] = cache.get_or_run("key", run)
+            except SessionCancelled as e:
+                outcome["leader"] = e
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    return thread
+
+
+def test_follower_stops_waiting_when_its_own_session_is_cancelled():
+    cache, release, outcome = RunCache(), threading.Event(), {}
+    leader = start_leader(cache, Session(), release, outcome)
+
+    follower = Session()
+    threading.Timer(0.05, follower.token.cancel, args=("user B cancelled",)).start()
+    with activate(follower), pytest.raises(SessionCancelled, match="user B cancelled"):
+        cache.get_or_run("key", lambda: "unused")
+
+    release.set()
+    leader.join(5)
+    assert outcome["leader"] == ("leader result", False)
+
+
+def test_follower_runs_itself_when_the_leader_is_cancelled():
+    cache, release, outcome = RunCache(), threading.Event(), {}
+    leader_session = Session()
+    leader = start_leader(cache, leader_session, release, outcome)
+
+    def cancel_leader():
+        leader_session.token.cancel("user A cancelled")
+        release.set()
+
+    threading.Timer(0.05, cancel_leader).start()
+    with activate(Session()):
+        result = cache.get_or_run("key", lambda: "follower result")
+
+    leader.join(5)
+    assert isinstance(outcome["leader"], SessionCancelled)
+    assert result == ("follower result", False)
+    assert cache.get_or_run("key", lambda: "unused") == ("follower result", True)
+
+
+def test_key_changes_with_any_source_or_the_args(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    script, module = tmp_path / "main.py", tmp_path / "pkg" / "helper.py"
+    script.write_text("import pkg.helper\n")
+    module.write_text("X = 1\n")
+    cache = RunCache()
+    key = cache.key(tmp_path, str(script), ["3 + 5"])
+
+    assert cache.key(tmp_path, str(script), ["3 + 5"]) == key
+    assert cache.key(tmp_path, str(script), ["3 + 6"]) != key
+    module.write_text("X = 22\n")
+    assert cache.key(tmp_path, str(script), ["3 + 5"]) != key
+
+
+def test_failed_runs_are_not_memoized():
+    cache = RunCache()
+
+    def fail():
+        raise OSError("no such interpreter")
+
+    with pytest.raises(OSError):
+        cache.get_or_run("key", fail)
+    assert cache.get_or_run("key", lambda: "ok") == ("ok", False)
+    assert cache.get_or_run("key", fail) == ("ok", True)
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = RunCache(max_entries=2)
+    cache.get_or_run("a", lambda: "a")
+    cache.get_or_run("b", lambda: "b")
+    cache.get_or_run("a", lambda: "unused")  # a is now the most recently used
+    cache.get_or_run("c", lambda: "c")
+
+    assert cache.get_or_run("a", lambda: "unused") == ("a", True)
+    assert cache.get_or_run("b", lambda: "b again") == ("b again", False)
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from functions.scheduler import ExecutionScheduler
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_waiting_runs_are_admitted_in_arrival_order():
+    scheduler = ExecutionScheduler(slots=1)
+    admitted = []
+
+    def request(name):
+        with scheduler.slot():
+            admitted.append(name)
+
+    threads = []
+    with scheduler.slot():
+        for i, name in enumerate("abcd"):
+            thread = threading.Thread(target=request, args=(name,))
+            thread.start()
+            threads.append(thread)
+            # Queue them one at a time so the arrival order is known
+            wait_until(lambda: scheduler.stats()["queued"] == i + 1)
+    for thread in threads:
+        thread.join(5)
+
+    assert admitted == list("abcd")
+    assert scheduler.stats() == {"running": 0, "queued": 0}
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="reads /proc")
+def test_timeout_kills_the_whole_process_tree(tmp_path):
+    pid_file = tmp_path / "grandchild.pid"
+    script = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(30)\n"
+    )
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        ExecutionScheduler().run([sys.executable, "-c", script], cwd=tmp_path, timeout=1)
+
+    grandchild = int(pid_file.read_text())
+    wait_until(lambda: not _alive(grandchild))
+
+
+def test_resource_limits_are_applied_before_the_child_runs(tmp_path):
+    # Read first thing in the child: the limits are already in place
+    script = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU), resource.getrlimit(resource.RLIMIT_AS))"
+    result = ExecutionScheduler().run(
+        [sys.executable, "-c", script], cwd=tmp_path, cpu_seconds=7, memory_bytes=1 << 32
+    )
+    assert result.stdout.strip() == f"(7, 7) ({1 << 32}, {1 << 32})"
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            # A zombie is dead, it is only waiting to be reaped
+            return file.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+import call_function as call_function_module
+import main
+from main import run_session
+from session import Session
+from test_routing import FakeClient, function_call, text
+
+
+class SlowClient(FakeClient):
+    """Writes a.txt with the first response; the second request blocks or raises."""
+
+    def __init__(self, second):
+        super().__init__([function_call("write_file", file_path="a.txt", content="x")])
+        respond = self.models.generate_content
+
+        def generate_content(model, contents, config):
+            if self.models.responses:
+                return respond(model, contents, config)
+            if isinstance(second, BaseException):
+                raise second
+            time.sleep(second)
+            return text("too late")
+
+        self.models.generate_content = generate_content
+
+
+@pytest.fixture
+def working_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(call_function_module, "WORKING_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_model_call_timeout_keeps_the_writes_and_returns_a_partial_result(working_dir, monkeypatch):
+    monkeypatch.setattr(main, "MODEL_CALL_TIMEOUT", 0.2)
+
+    result = run_session(SlowClient(second=2), "write a.txt")
+
+    assert result.startswith("Session stopped early (Model call timed out after 0.2 seconds)")
+    assert "Tools called: write_file" in result
+    assert (working_dir / "a.txt").read_text() == "x"
+
+
+def test_deadline_keeps_the_writes_and_returns_a_partial_result(working_dir):
+    result = run_session(SlowClient(second=2), "write a.txt", session=Session(budget_seconds=0.3))
+
+    assert "time budget of 0.3 seconds exhausted" in result
+    assert (working_dir / "a.txt").read_text() == "x"
+
+
+def test_cancel_discards_the_writes(working_dir):
+    session = Session()
+    threading.Timer(0.2, session.token.cancel, args=("user cancelled",)).start()
+
+    result = run_session(SlowClient(second=2), "write a.txt", session=session)
+
+    assert result.startswith("Session stopped early (user cancelled)")
+    assert not (working_dir / "a.txt").exists()
+
+
+def test_ctrl_c_cancels_the_session_and_discards_the_writes(working_dir):
+    session = Session()
+
+    result = run_session(SlowClient(second=KeyboardInterrupt()), "write a.txt", session=session)
+
+    assert result.startswith("Session stopped early (interrupted by user)")
+    assert session.token.cancelled
+    assert not (working_dir / "a.txt").exists()
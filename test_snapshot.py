@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from functions.get_changes import get_changes
+from functions.snapshot import SnapshotStore, snapshot_store
+from functions.workspace import workspace
+
+
+def make_tree(root):
+    (root / "pkg").mkdir()
+    (root / "pkg" / "calculator.py").write_text("x = 1\n")
+    (root / "pkg" / "render.py").write_text("y = 2\n")
+    (root / "main.py").write_text("print('hi')\n")
+    (root / "notes").write_text("a file for now\n")
+
+
+def test_diff_reports_added_modified_removed_and_kind_changes(tmp_path):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    make_tree(tree)
+    store = SnapshotStore(tmp_path / "cache")
+    before = store.take(tree)
+
+    (tree / "pkg" / "calculator.py").write_text("x = 2\n")
+    (tree / "pkg" / "render.py").unlink()
+    (tree / "pkg" / "session.py").write_text("z = 3\n")
+    # notes turns from a file into a directory, pkg stays a directory
+    (tree / "notes").unlink()
+    (tree / "notes").mkdir()
+    (tree / "notes" / "todo.txt").write_text("x\n")
+
+    after, changes = store.changes(tree, before)
+    assert changes == {
+        "added": ["notes/todo.txt", "pkg/session.py"],
+        "removed": ["notes", "pkg/render.py"],
+        "modified": ["pkg/calculator.py"],
+    }
+    assert store.changes(tree, after)[1] == {"added": [], "removed": [], "modified": []}
+
+
+def test_unchanged_stat_data_reuses_file_hashes(tmp_path):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    make_tree(tree)
+    path = tree / "main.py"
+    stat = path.stat()
+    first = SnapshotStore(tmp_path / "cache").take(tree)
+
+    # Same size and mtime: a new store finds the saved snapshot and does not re-read the file
+    path.write_text("print('ho')\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    store = SnapshotStore(tmp_path / "cache")
+    assert store.take(tree) == first
+
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert store.changes(tree, first)[1]["modified"] == ["main.py"]
+
+
+def test_unknown_snapshot_ids(tmp_path):
+    store = SnapshotStore(tmp_path / "cache")
+    assert store.load("0123456789abcdef") is None
+    assert store.load("../latest") is None
+    assert store.latest_id(tmp_path) is None
+    with pytest.raises(KeyError):
+        store.changes(tmp_path, "0123456789abcdef")
+    assert get_changes(str(tmp_path), since="nope") == 'Error: Unknown snapshot "nope"'
+
+
+def test_snapshot_with_pending_writes_does_not_become_latest(tmp_path, monkeypatch):
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    make_tree(tree)
+    monkeypatch.setattr(snapshot_store, "directory", str(tmp_path / "cache" / "snapshots"))
+    monkeypatch.setattr(snapshot_store, "_latest", {})
+    start = snapshot_store.take(tree)
+
+    transaction = workspace.begin()
+    try:
+        workspace.write_text(str(tree / "pkg" / "new.py"), "w = 4\n")
+        result = get_changes(str(tree), since=start)
+        assert "- added: pkg/new.py" in result
+    finally:
+        transaction.abort()
+
+    # What the next session is told at start: nothing changed on disk
+    assert snapshot_store.latest_id(tree) == start
+    assert get_changes(str(tree), since=start).startswith(f"No changes since snapshot {start}")
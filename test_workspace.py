@@ -0,0 +1,112 @@
+import contextvars
+import threading
+
+import pytest
+
+from functions.workspace import Workspace
+
+
+def test_writes_outside_a_transaction_go_to_disk(tmp_path):
+    workspace = Workspace()
+    path = str(tmp_path / "sub" / "a.txt")
+
+    workspace.write_text(path, "direct")
+
+    assert not workspace.active
+    assert open(path).read() == "direct"
+
+
+def test_begin_buffers_writes_and_reads_through(tmp_path):
+    workspace = Workspace()
+    existing = tmp_path / "existing.txt"
+    existing.write_text("on disk")
+    new = str(tmp_path / "pkg" / "new.txt")
+
+    transaction = workspace.begin()
+    try:
+        workspace.write_text(new, "pending")
+
+        assert workspace.active and transaction.active
+        assert not (tmp_path / "pkg").exists()
+        assert workspace.read_text(new) == "pending"
+        assert workspace.read_text(str(existing)) == "on disk"
+        assert workspace.isfile(new) and workspace.isdir(str(tmp_path / "pkg"))
+        assert workspace.getsize(new) == len("pending")
+        assert workspace.listdir(str(tmp_path)) == ["existing.txt", "pkg"]
+        assert workspace.pending_files() == [new]
+        with pytest.raises(RuntimeError):
+            workspace.begin()
+    finally:
+        transaction.abort()
+
+
+def test_commit_flushes_pending_writes(tmp_path):
+    workspace = Workspace()
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+
+    transaction = workspace.begin()
+    workspace.write_text(str(path), "new")
+    workspace.write_text(str(tmp_path / "dir" / "b.txt"), "b")
+    assert path.read_text() == "old"
+    transaction.commit()
+
+    assert not workspace.active
+    assert path.read_text() == "new"
+    assert (tmp_path / "dir" / "b.txt").read_text() == "b"
+
+
+def test_abort_restores_materialized_files(tmp_path):
+    workspace = Workspace()
+    path = tmp_path / "a.txt"
+    path.write_text("old")
+    created = tmp_path / "dir" / "b.txt"
+
+    transaction = workspace.begin()
+    workspace.write_text(str(path), "new")
+    workspace.write_text(str(created), "b")
+    workspace.materialize()
+    assert path.read_text() == "new" and created.read_text() == "b"
+    transaction.abort()
+
+    assert not workspace.active
+    assert path.read_text() == "old"
+    assert not (tmp_path / "dir").exists()
+
+
+def test_overlapping_transactions_are_isolated(tmp_path):
+    workspace = Workspace()
+    a_path, b_path = str(tmp_path / "a.txt"), str(tmp_path / "b.txt")
+    a_wrote, b_ended = threading.Event(), threading.Event()
+    seen = {}
+
+    def session_a():
+        transaction = workspace.begin()
+        workspace.write_text(a_path, "from a")
+        a_wrote.set()
+        b_ended.wait(5)
+        seen["a sees b"] = workspace.isfile(b_path)
+        transaction.commit()
+
+    def session_b():
+        a_wrote.wait(5)
+        transaction = workspace.begin()
+        seen["b sees a"] = workspace.isfile(a_path)
+        workspace.write_text(b_path, "from b")
+        transaction.abort()
+        b_ended.set()
+
+    threads = [
+        threading.Thread(target=contextvars.Context().run, args=(session,))
+        for session in (session_a, session_b)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert seen == {"a sees b": False, "b sees a": False}
+    # b's abort left a's pending write alone, and a's commit wrote only its own file
+    assert open(a_path).read() == "from a"
+    assert not (tmp_path / "b.txt").exists()
+    assert not workspace.active
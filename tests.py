@@ -135,6 +135,69 @@ def run_tests():
     print("Expected: get_files_info({'directory': 'pkg'})")
     print("Note: This test demonstrates the LLM's ability to choose the right function")
 
+    print("\n🧪 TESTING get_file_outline FUNCTION")
+    print("=" * 50)
+
+    # TEST 15: Outline calculator/pkg/calculator.py
+    print("\n🗂️ TEST 15: Outlining calculator/pkg/calculator.py")
+    print("-" * 40)
+    from functions.get_file_outline import get_file_outline
+
+    result = get_file_outline("calculator", "pkg/calculator.py")
+    print("Result for 'pkg/calculator.py':")
+    print(result)
+    print("\nExpected: class Calculator and its methods with line ranges")
+
+    # TEST 16: Security test - try to outline ../main.py (should return error)
+    print("\n🚫 TEST 16: Security check - trying to outline ../main.py")
+    print("-" * 40)
+    result = get_file_outline("calculator", "../main.py")
+    print("Result for '../main.py':")
+    print(result)
+    print("\nExpected: Error message about being outside permitted working directory")
+
+    print("\n🧪 TESTING run_tests FUNCTION")
+    print("=" * 50)
+
+    # TEST 17: Run every unittest test in calculator/
+    print("\n🧪 TEST 17: Running all calculator tests")
+    print("-" * 40)
+    from functions.run_tests import run_tests
+
+    result = run_tests("calculator")
+    print("Result for all tests:")
+    print(result)
+    print("\nExpected: JSON summary with status passed and 15 tests run")
+
+    # TEST 18: Run only the tests affected by a change to pkg/calculator.py
+    print("\n🧪 TEST 18: Running tests affected by pkg/calculator.py")
+    print("-" * 40)
+    result = run_tests("calculator", changed_files=["pkg/calculator.py"])
+    print("Result for changed_files=['pkg/calculator.py']:")
+    print(result)
+    print("\nExpected: JSON summary for the tests that import pkg.calculator")
+
+    print("\n🧪 TESTING get_files_content FUNCTION")
+    print("=" * 50)
+
+    # TEST 19: Read every module in calculator/pkg in one call
+    print("\n📚 TEST 19: Reading calculator/pkg/*.py in one call")
+    print("-" * 40)
+    from functions.get_files_content import get_files_content
+
+    result = get_files_content("calculator", pattern="pkg/*.py")
+    print("Result for pattern 'pkg/*.py':")
+    print(result)
+    print("\nExpected: pkg/calculator.py and pkg/render.py, each under its own header")
+
+    # TEST 20: Security test - one path outside the working directory
+    print("\n🚫 TEST 20: Security check - reading main.py and ../main.py together")
+    print("-" * 40)
+    result = get_files_content("calculator", file_paths=["main.py", "../main.py"])
+    print("Result for ['main.py', '../main.py']:")
+    print(result)
+    print("\nExpected: main.py content, then an error for ../main.py only")
+
     print("\n" + "=" * 50)
     print("✅ ALL TESTS COMPLETED!")
     print("\n💡 TROUBLESHOOTING TIPS:")